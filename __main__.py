@@ -1,34 +1,26 @@
+import os
+
 import pulumi
 
-from git_automation.git_repository_component import GitRepositoryComponent
-
-_BUILD_TARGET = {"go": "main.go", "rust": "bin"}
-
-_BUILD_PLATFORMS = {
-    "docker": [
-        {"os": "linux", "arch": "amd64", "runner": "ubuntu-24.04"},
-        {"os": "linux", "arch": "arm64", "runner": "ubuntu-24.04-arm"},
-    ],
-    "go": [
-        {"os": "linux", "arch": "amd64", "runner": "ubuntu-24.04"},
-        {"os": "linux", "arch": "arm64", "runner": "ubuntu-24.04-arm"},
-        {"os": "darwin", "arch": "amd64", "runner": "macos-15-intel"},
-        {"os": "darwin", "arch": "arm64", "runner": "macos-15"},
-        {"os": "windows", "arch": "amd64", "runner": "windows-2025"},
-        {"os": "windows", "arch": "arm64", "runner": "windows-11-arm"},
-    ],
-    "rust": [
-        {"target": "x86_64-unknown-linux-gnu", "runner": "ubuntu-24.04"},
-        {"target": "x86_64-unknown-linux-musl", "runner": "ubuntu-24.04"},
-        {"target": "aarch64-unknown-linux-gnu", "runner": "ubuntu-24.04-arm"},
-        {"target": "aarch64-unknown-linux-musl", "runner": "ubuntu-24.04-arm"},
-        {"target": "x86_64-apple-darwin", "runner": "macos-15-intel"},
-        {"target": "aarch64-apple-darwin", "runner": "macos-15"},
-        {"target": "x86_64-pc-windows-msvc", "runner": "windows-2025"},
-        {"target": "x86_64-pc-windows-gnu", "runner": "windows-2025"},
-        {"target": "aarch64-pc-windows-msvc", "runner": "windows-11-arm"},
-    ],
-}
+from git_automation.cache import CACHE_DIR
+from git_automation.cpu_profile import profile_program
+from git_automation.git_repository_component import GitRepositoryComponent, env
+from git_automation.manifest import (
+    compile_plans,
+    load_manifest,
+    profile_key,
+    readme_context,
+    repository_context,
+)
+from git_automation.organization import (
+    sync_organization_rulesets,
+    sync_organization_settings,
+)
+from git_automation.ratelimit import RateLimiter
+from git_automation.remote import GithubApi, GitMirror
+from git_automation.repositories import load_repositories
+from git_automation.template_cache import TemplateCache
+from git_automation.validation import validate_repositories
 
 config = pulumi.Config()
 
@@ -38,190 +30,152 @@ owner = pulumi.Config("github").require("owner")
 if author is None:
     raise ValueError("Author can't be None")
 
-for repository_config in config.get_object("repositories", []):
-    pages = repository_config.get("pages", None)
-    workflow = False
-    workflow_lint = False
-    workflow_test = False
-    workflow_package = False
-    workflow_changelog = False
-    workflow_documentation = False
-    if "workflow" in repository_config:
-        workflow = True
-        workflow_lint = (
-            "lint" in repository_config["workflow"]
-            and repository_config["workflow"]["lint"]
-        )
-        workflow_test = (
-            "test" in repository_config["workflow"]
-            and repository_config["workflow"]["test"]
-        )
-        workflow_package = (
-            "package" in repository_config["workflow"]
-            and repository_config["workflow"]["package"]
-        )
-        workflow_changelog = (
-            "changelog" in repository_config["workflow"]
-            and repository_config["workflow"]["changelog"]
-        )
-        workflow_documentation = (
-            "documentation" in repository_config["workflow"]
-            and repository_config["workflow"]["documentation"]
-        )
+# opt-in CPU profile of the run, see git_automation.cpu_profile
+profile_dir = config.get("profile_dir")
+if profile_dir:
+    profile_program(profile_dir)
+
+# one organization ruleset per distinct set of required checks
+organization_rulesets = config.get_bool("organization_rulesets", False)
+
+# "organization": actions permissions set once as organization defaults, the
+# other settings batched per repository, "batched": every setting batched
+# the resources it replaces must be removed from the state first (README), their
+# deletion would unpublish the pages sites
+repository_settings = config.get("repository_settings")
+if repository_settings not in (None, "organization", "batched"):
+    raise ValueError("repository_settings must be organization or batched")
+
+# managed files recorded in the state by digest only
+file_store = config.get_bool("file_store", False)
+
+# templates regenerated from the READMEs, persisted as bytecode between runs
+readme_templates = TemplateCache(
+    env,
+    directory=os.path.join(CACHE_DIR, "templates")
+    if config.get_bool("readme_bytecode_cache", False)
+    else None,
+)
+
+settings = {
+    "owner": owner,
+    "default_branch_name": config.get("default_branch_name", "main"),
+    "branch_name": config.get("branch_name"),
+    "funding": config.get_object("funding"),
+    "contact_email": config.get("contact_email"),
+    "security_email": config.get("security_email"),
+}
 
-    renovatebot = "renovatebot" in repository_config
-    package_name = repository_config.get("package", None)
-    devenv = repository_config.get("devenv", False)
-    devcontainer = repository_config.get("devcontainer", False)
-    helm_chart_name = repository_config.get("helm_chart_name", None)
-    helm = helm_chart_name is not None
-    docker = repository_config.get("docker", False)
-    language = repository_config.get("language", None)
-    versions = repository_config.get("versions", [])
-    gitignore = repository_config.get("gitignore", False)
-    readme = repository_config.get("readme", False)
-
-    binary = language in ["rust", "go"] and package_name
-    build_target = repository_config.get(
-        "build_target", _BUILD_TARGET.get(language, None)
+repository_configs = config.get_object("repositories", [])
+
+# one YAML file per repository
+repositories_dir = config.get("repositories_dir")
+if repositories_dir:
+    repository_configs += load_repositories(repositories_dir)
+
+repository_names = [
+    repository_config["name"] for repository_config in repository_configs
+]
+if len(set(repository_names)) != len(repository_names):
+    raise ValueError("Repository names must be unique")
+contexts = [
+    repository_context(repository_config, settings)
+    for repository_config in repository_configs
+]
+plans = compile_plans(load_manifest(), contexts)
+
+# shared with the other runs using the same token, and with the dynamic providers
+rate_limit = config.get_object("rate_limit")
+
+# read the existing files from local bare mirrors instead of the REST API
+mirror = config.get_object("mirror")
+if mirror is not None:
+    remote = GitMirror(owner, **mirror)
+    remote.refresh(
+        [
+            repository_config["name"]
+            for repository_config in repository_configs
+            if repository_config.get("readme", False)
+        ],
+        settings["default_branch_name"],
     )
-    binary_platforms = _BUILD_PLATFORMS.get(language, None)
-    docker_platforms = _BUILD_PLATFORMS["docker"] if docker else None
+else:
+    remote = GithubApi(owner, RateLimiter(**rate_limit) if rate_limit else None)
+
+repositories = []
+
+for repository_config, context in zip(repository_configs, contexts):
+    pages = repository_config.get("pages", None)
 
     repository = GitRepositoryComponent(
         owner=owner,
         name=repository_config["name"],
-        default_branch_name=config.get("default_branch_name", "main"),
-        branch_name=config.get("branch_name"),
+        default_branch_name=settings["default_branch_name"],
+        branch_name=settings["branch_name"],
         description=repository_config["description"],
         author_fullname=author["fullname"],
         author_email=author["email"],
         homepage_url=repository_config.get("homepage_url", None),
         topics=repository_config.get("topics", None),
+        remote=remote,
+        file_store=file_store,
+        template_cache=readme_templates,
+        rate_limit=rate_limit,
     )
+    repositories.append(repository)
 
-    if pages:
+    if repository_settings is None and pages:
         repository.sync_repository_pages(pages)
 
-    repository.sync_repository_ruleset(
-        language,
-        versions,
-        binary,
-        binary_platforms,
-        workflow_lint,
-        workflow_test,
-        docker,
-        docker_platforms,
+    repository.set_required_checks(
+        context["language"],
+        context["versions"],
+        context["binary"],
+        context["binary_platforms"],
+        context["workflow_lint"],
+        context["workflow_test"],
+        context["docker"],
+        context["docker_platforms"],
     )
 
-    repository.sync_workflow_repository_permission()
+    if not organization_rulesets:
+        repository.sync_repository_ruleset()
 
-    repository.sync_action_repository_permission()
+    if repository_settings is None:
+        repository.sync_workflow_repository_permission()
 
-    repository.sync_vulnerability_alerts()
+        repository.sync_action_repository_permission()
+
+        repository.sync_vulnerability_alerts()
+    else:
+        repository.sync_repository_settings(
+            pages, actions=repository_settings == "batched"
+        )
 
     app_installation_ids = config.get_object("app_installation_ids")
     if app_installation_ids:
-        repository.sync_app_installation(renovatebot, app_installation_ids)
-
-    if repository_config.get("license"):
-        repository.sync_licence(repository_config["license"])
+        repository.sync_app_installation(context["renovatebot"], app_installation_ids)
 
-    funding = config.get_object("funding")
-    if funding:
-        repository.sync_funding(funding)
+    repository.sync_plan(plans[profile_key(context)], context)
 
-    repository.sync_pull_request_template()
-
-    repository.sync_contributing()
-
-    repository.sync_support()
-
-    repository.sync_issue_template(language)
-
-    repository.sync_codeowner()
-
-    repository.sync_vscode_config(language)
-
-    repository.sync_linter_config(language)
-
-    repository.sync_editorconfig(language, docker)
+    if repository_config.get("label"):
+        repository.sync_label(
+            context["language"], context["docker"], context["renovatebot"]
+        )
 
-    repository.sync_gitattributes()
+    if repository_config.get("readme", False):
+        repository.sync_readme(**readme_context(repository_config, context))
 
-    if gitignore:
-        repository.sync_gitignore(language, helm, devenv)
+if organization_rulesets:
+    sync_organization_rulesets(repositories)
 
-    contact_email = config.get("contact_email")
-    if contact_email:
-        repository.sync_code_of_conduct(contact_email)
+if repository_settings == "organization":
+    sync_organization_settings(owner)
 
-    security_email = config.get("security_email")
-    if security_email:
-        repository.sync_security(security_email)
+# abort before any file is pushed if a rendered file is broken
+validate_repositories(repositories)
 
-    if repository_config.get("label"):
-        repository.sync_label(language, docker, renovatebot)
-
-    if renovatebot:
-        renovatebot_configs = repository_config["renovatebot"].get("configs", [])
-
-        if devcontainer and "devcontainer" not in renovatebot_configs:
-            renovatebot_configs.append("devcontainer")
-        if helm and "helm" not in renovatebot_configs:
-            renovatebot_configs.append("helm")
-        if docker and "docker" not in renovatebot_configs:
-            renovatebot_configs.append("docker")
-        renovatebot_configs.append(language)
-
-        repository.sync_renovatebot(
-            repository_config["renovatebot"].get("schedule", None),
-            language,
-            renovatebot_configs,
-            repository_config["renovatebot"].get("additionnal_configs", []),
-        )
+for repository in repositories:
+    repository.register_files()
 
-    if "logo" in repository_config:
-        repository.sync_logo(repository_config["logo"])
-
-    if readme:
-        readme_args = {} if isinstance(readme, bool) else readme
-        dev = []
-
-        if devenv:
-            dev.append("devenv")
-        if devcontainer:
-            dev.append("devcontainer")
-
-        repository.sync_readme(
-            repository_config["title"],
-            repository_config["description"],
-            repository_config.get("documentation_url", None),
-            "logo" in repository_config,
-            language,
-            package_name,
-            workflow_lint,
-            workflow_test,
-            readme_args.get("docker", docker),
-            helm,
-            helm_chart_name,
-            dev,
-            readme_args.get("configuration", True),
-        )
-
-    if workflow:
-        repository.sync_workflow(
-            package_name,
-            language,
-            versions,
-            binary,
-            build_target,
-            binary_platforms,
-            workflow_lint,
-            workflow_test,
-            workflow_package,
-            workflow_documentation,
-            workflow_changelog,
-            docker,
-            docker_platforms,
-        )
+pulumi.log.info(f"README templates: {readme_templates.report()}")
@@ -0,0 +1,94 @@
+import os
+import re
+import tempfile
+
+from git_automation.cache import cache_path, digest
+
+# bump to invalidate the cached outputs when the pipeline changes
+_PIPELINE_VERSION = "2"
+
+_EDITOR_NAMESPACES = "sodipodi|inkscape|sketch|serif"
+
+_SVG_CRUFT = re.compile(
+    r"<\?xml.*?\?>"
+    r"|<!DOCTYPE[^>]*>"
+    r"|<!--.*?-->"
+    r"|<metadata\b[^>]*/>|<metadata\b.*?</metadata>"
+    rf"|<(?:{_EDITOR_NAMESPACES}):[\w-]+\b[^>]*/>"
+    rf"|<((?:{_EDITOR_NAMESPACES}):[\w-]+)\b.*?</\1>",
+    re.DOTALL,
+)
+_SVG_EDITOR_ATTRIBUTES = re.compile(
+    rf'\s(?:xmlns:(?:{_EDITOR_NAMESPACES})|(?:{_EDITOR_NAMESPACES}):[\w-]+|data-name)="[^"]*"'
+)
+_SVG_ID = re.compile(r'\sid="([^"]*)"')
+_SVG_GEOMETRY = re.compile(r'(\s(?:d|points)=")([^"]*)(")')
+# whitespace inside text elements is rendered
+_SVG_TEXT = re.compile(r"(<text\b.*?</text>)", re.DOTALL)
+
+
+def _minify_geometry(data: str) -> str:
+    data = re.sub(r"\s+", " ", data.strip())
+    data = re.sub(r"\s*,\s*", ",", data)
+    # separators are optional around commands and before a negative number
+    data = re.sub(r"\s*([a-zA-Z])\s*", r"\1", data)
+    data = re.sub(r"[ ,](-)", r"\1", data)
+    # leading zeros of decimals
+    return re.sub(r"(?<![\d.])0(\.\d)", r"\1", data)
+
+
+def optimize_svg(content: str) -> str:
+    content = _SVG_CRUFT.sub("", content)
+    content = _SVG_EDITOR_ATTRIBUTES.sub("", content)
+
+    # ids are kept only when referenced (url(#id), href="#id")
+    content = _SVG_ID.sub(
+        lambda match: match[0] if f"#{match[1]}" in content else "", content
+    )
+    content = _SVG_GEOMETRY.sub(
+        lambda match: match[1] + _minify_geometry(match[2]) + match[3], content
+    )
+
+    # odd parts are text elements, kept as they are
+    parts = _SVG_TEXT.split(content)
+    parts[::2] = [re.sub(r"(^|>)\s+(<|$)", r"\1\2", part) for part in parts[::2]]
+
+    return "".join(parts).strip()
+
+
+def normalize_text(content: str) -> str:
+    content = content.removeprefix("\ufeff")
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+    return content.rstrip("\n") + "\n"
+
+
+def optimize_asset(path: str, content: str) -> str:
+    """Optimized version of a static file, cached on disk by source hash
+
+    :param path: Asset path, its extension selects the optimizations
+    :param content: Asset source
+    """
+    extension = os.path.splitext(path)[1]
+    cached = cache_path(
+        "assets", digest(f"{_PIPELINE_VERSION}\0{extension}\0{content}")
+    )
+
+    try:
+        with open(cached, encoding="utf-8", newline="") as file:
+            return file.read()
+    except OSError:
+        pass
+
+    if extension == ".svg":
+        content = optimize_svg(content)
+    content = normalize_text(content)
+
+    # a reader never sees a partly written file
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", newline="", dir=os.path.dirname(cached), delete=False
+    ) as file:
+        file.write(content)
+    os.replace(file.name, cached)
+
+    return content
@@ -0,0 +1,26 @@
+import hashlib
+import os
+
+PACKAGE_NAME = __name__.split(".")[0]
+
+CACHE_DIR = os.environ.get(
+    "GIT_AUTOMATION_CACHE_DIR",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+        PACKAGE_NAME,
+    ),
+)
+
+
+def digest(content: str | bytes) -> str:
+    if isinstance(content, str):
+        content = content.encode()
+
+    return hashlib.sha256(content).hexdigest()
+
+
+def cache_path(*parts: str) -> str:
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    return path
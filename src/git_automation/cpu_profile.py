@@ -0,0 +1,182 @@
+"""CPU profile of the Pulumi program, sampled per repository and sync method
+
+    python -m git_automation.cpu_profile --stack prod --output profile
+
+The program runs against the Pulumi mock runtime while the stacks of every
+thread are sampled, each sample is attributed to the GitRepositoryComponent
+method running at that time and its repository. Set `profile_dir` in the stack
+config to profile a real `pulumi up` instead.
+
+The output directory receives:
+- profile.folded: collapsed stacks rooted at "repository;method", readable by
+  flamegraph.pl, inferno or speedscope
+- <method>.folded: collapsed stacks of a single method, all repositories merged
+- methods.txt: samples per method and per repository
+"""
+
+import argparse
+import atexit
+import os
+import sys
+import threading
+from collections import defaultdict
+from contextlib import ExitStack
+from types import FrameType
+
+from git_automation.harness import instrument, run_program
+
+# samples taken outside of any component method
+_PROGRAM = "(program)"
+
+# threads blocked on these frames are waiting, not using the CPU
+_IDLE_FRAMES = {
+    "concurrent.futures.thread:_worker",
+    "threading:Condition.wait",
+    "selectors:EpollSelector.select",
+    "selectors:KqueueSelector.select",
+    "selectors:PollSelector.select",
+    "selectors:SelectSelector.select",
+}
+
+
+def _frame_name(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005) -> None:
+        """Sample the stack of every busy thread from a background thread
+
+        :param interval: Seconds between two samples
+        """
+        self.interval = interval
+        self.context: list[tuple[str, str]] = []
+        self.stacks: dict[tuple[str, str, str], int] = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def before(self, repository: str, method: str):
+        self.context.append((repository, method))
+
+    def after(self, repository: str, method: str):
+        self.context.pop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # a single read, the context can be popped between a check and an index
+            top = self.context[-1:]
+            repository, method = top[0] if top else ("", _PROGRAM)
+
+            for thread_id, frame in sys._current_frames().items():
+                if (
+                    thread_id == self._thread.ident
+                    or _frame_name(frame) in _IDLE_FRAMES
+                ):
+                    continue
+
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                self.stacks[repository, method, ";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def table(self, top: int = 10) -> str:
+        method_samples: dict[str, int] = defaultdict(int)
+        repository_samples: dict[str, int] = defaultdict(int)
+        for (repository, method, _), samples in self.stacks.items():
+            method_samples[method] += samples
+            repository_samples[repository or _PROGRAM] += samples
+        total = sum(method_samples.values()) or 1
+
+        lines = [f"{'method':<40} {'samples':>8} {'ms':>8} {'share':>6}"]
+        for method, samples in sorted(method_samples.items(), key=lambda i: -i[1]):
+            lines.append(
+                f"{method:<40} {samples:>8} {samples * self.interval * 1000:>8.0f} "
+                f"{samples / total:>6.1%}"
+            )
+
+        lines.append(f"\n{'repository':<40} {'samples':>8} {'ms':>8} {'share':>6}")
+        for repository, samples in sorted(
+            repository_samples.items(), key=lambda i: -i[1]
+        )[:top]:
+            lines.append(
+                f"{repository:<40} {samples:>8} {samples * self.interval * 1000:>8.0f} "
+                f"{samples / total:>6.1%}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str, top: int = 10) -> str:
+        """Write the collapsed stacks and the method table, returns the table"""
+        os.makedirs(directory, exist_ok=True)
+
+        method_stacks: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        with open(os.path.join(directory, "profile.folded"), "w") as file:
+            for (repository, method, stack), samples in sorted(self.stacks.items()):
+                root = f"{repository};{method}" if repository else method
+                file.write(f"{root};{stack} {samples}\n")
+                method_stacks[method][stack] += samples
+
+        for method, stacks in method_stacks.items():
+            filename = f"{method.strip('()')}.folded"
+            with open(os.path.join(directory, filename), "w") as file:
+                for stack, samples in sorted(stacks.items()):
+                    file.write(f"{stack} {samples}\n")
+
+        table = self.table(top)
+        with open(os.path.join(directory, "methods.txt"), "w") as file:
+            file.write(table)
+
+        return table
+
+
+def profile_program(directory: str, interval: float = 0.005) -> None:
+    """Profile the rest of the running program, written to directory at exit
+
+    :param directory: Output directory
+    :param interval: Seconds between two samples
+    """
+    profiler = SamplingProfiler(interval)
+    stack = ExitStack()
+    stack.enter_context(instrument(profiler.before, profiler.after))
+    profiler.start()
+
+    def finish():
+        profiler.stop()
+        stack.close()
+        profiler.write(directory)
+
+    atexit.register(finish)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--program", default="__main__.py")
+    parser.add_argument("--stack", default="prod")
+    parser.add_argument("--interval", type=float, default=0.005)
+    parser.add_argument("--output", default="profile")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    profiler = SamplingProfiler(args.interval)
+    with instrument(profiler.before, profiler.after):
+        profiler.start()
+        try:
+            run_program(args.program, args.stack)
+        finally:
+            profiler.stop()
+
+    print(profiler.write(args.output, args.top), end="")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import base64
+import os
+import tempfile
+from typing import Any
+
+import pulumi
+import pulumi.dynamic
+
+from git_automation.cache import cache_path, digest
+from git_automation.remote import provider_api
+
+# a change of one of them is a new file, the old one is deleted
+_LOCATION = ("owner", "repository", "branch", "file")
+
+
+def store(content: str) -> str:
+    """Write content to the local content addressed store, returns its digest"""
+    content_digest = digest(content)
+    path = cache_path("files", content_digest[:2], content_digest)
+
+    if not os.path.exists(path):
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", newline="", dir=os.path.dirname(path), delete=False
+        ) as file:
+            file.write(content)
+        os.replace(file.name, path)
+
+    return content_digest
+
+
+def load(content_digest: str) -> str:
+    with open(
+        cache_path("files", content_digest[:2], content_digest),
+        encoding="utf-8",
+        newline="",
+    ) as file:
+        return file.read()
+
+
+class _RepositoryFileProvider(pulumi.dynamic.ResourceProvider):
+    # the provider is pickled by reference, nothing secret is captured
+    serialize_as_secret_always = False
+
+    def _path(self, props: dict[str, Any]) -> str:
+        return f"repos/{props['owner']}/{props['repository']}/contents/{props['file']}"
+
+    def _sha(self, props: dict[str, Any]) -> str | None:
+        r = provider_api(props).request(
+            "GET", self._path(props), params={"ref": props["branch"]}
+        )
+        # an error must not read as a deleted file, delete would then drop the
+        # resource from the state and leave the file in the repository
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+
+        return r.json()["sha"]
+
+    def _put(self, props: dict[str, Any]) -> dict[str, Any]:
+        body = {
+            "message": props["commit_message"],
+            "content": base64.b64encode(load(props["digest"]).encode()).decode(),
+            "branch": props["branch"],
+            "committer": {
+                "name": props["commit_author"],
+                "email": props["commit_email"],
+            },
+        }
+        # the existing file is overwritten
+        sha = self._sha(props)
+        if sha is not None:
+            body["sha"] = sha
+
+        r = provider_api(props).request("PUT", self._path(props), json=body)
+        r.raise_for_status()
+
+        return {**props, "sha": r.json()["content"]["sha"]}
+
+    def create(self, props: dict[str, Any]) -> pulumi.dynamic.CreateResult:
+        return pulumi.dynamic.CreateResult(
+            f"{props['repository']}/{props['file']}", self._put(props)
+        )
+
+    def diff(
+        self, _id: str, olds: dict[str, Any], news: dict[str, Any]
+    ) -> pulumi.dynamic.DiffResult:
+        replaces = [key for key in _LOCATION if olds.get(key) != news.get(key)]
+
+        # a new commit message alone doesn't push the file again
+        return pulumi.dynamic.DiffResult(
+            changes=bool(replaces) or olds.get("digest") != news["digest"],
+            replaces=replaces,
+        )
+
+    def update(
+        self, _id: str, _olds: dict[str, Any], news: dict[str, Any]
+    ) -> pulumi.dynamic.UpdateResult:
+        return pulumi.dynamic.UpdateResult(self._put(news))
+
+    def read(self, id_: str, props: dict[str, Any]) -> pulumi.dynamic.ReadResult:
+        sha = self._sha(props)
+
+        # modified or deleted outside of pulumi, pushed again by the next update
+        if sha != props.get("sha"):
+            props = {**props, "sha": sha, "digest": ""}
+
+        return pulumi.dynamic.ReadResult(id_, props)
+
+    def delete(self, _id: str, props: dict[str, Any]) -> None:
+        sha = self._sha(props)
+        if sha is None:
+            return
+
+        r = provider_api(props).request(
+            "DELETE",
+            self._path(props),
+            json={
+                "message": props["commit_message"],
+                "sha": sha,
+                "branch": props["branch"],
+                "committer": {
+                    "name": props["commit_author"],
+                    "email": props["commit_email"],
+                },
+            },
+        )
+        r.raise_for_status()
+
+
+class StoredRepositoryFile(pulumi.dynamic.Resource, module="github", name="File"):
+    def __init__(
+        self,
+        name: str,
+        owner: str,
+        repository: str,
+        branch: pulumi.Input[str],
+        file: str,
+        content: str,
+        commit_message: str,
+        commit_author: str,
+        commit_email: str,
+        rate_limit: dict[str, Any] | None = None,
+        opts: pulumi.ResourceOptions | None = None,
+    ) -> None:
+        """Repository file whose state only records its path and content digest,
+        the content is read from the local content addressed store when pushed
+
+        :param name: Resource name
+        :param owner: Git owner
+        :param repository: Repository name
+        :param branch: Branch the file is committed to
+        :param file: Path of the file in the repository
+        :param content: File content
+        :param commit_message: Message of the commits pushing the file
+        :param commit_author: Committer name
+        :param commit_email: Committer email
+        :param rate_limit: RateLimiter arguments of the API calls, None for the
+            defaults
+        """
+        super().__init__(
+            _RepositoryFileProvider(),
+            name,
+            {
+                "owner": owner,
+                "repository": repository,
+                "branch": branch,
+                "file": file,
+                "digest": store(content),
+                "commit_message": commit_message,
+                "commit_author": commit_author,
+                "commit_email": commit_email,
+                "rate_limit": rate_limit,
+                "sha": None,
+            },
+            opts,
+        )
@@ -1,24 +1,59 @@
 import os
 import re
 from collections.abc import Awaitable, Mapping
-from importlib import resources
 from typing import Any
 
 import pulumi
 import pulumi_github as github
-import requests
 import yaml
-from jinja2 import Environment, PackageLoader
+from jinja2 import Environment, PackageLoader, StrictUndefined, Template
 from pulumi.output import Output
 
+from git_automation.file_store import StoredRepositoryFile
+from git_automation.ratelimit import RateLimiter
+from git_automation.remote import GithubApi, GitMirror
+from git_automation.repository_settings import RepositorySettings
+from git_automation.template_cache import TemplateCache
+from git_automation.validation import YAML_LOADER
+
 PACKAGE_NAME = __name__.split(".")[0]
 
+GITHUB_ACTIONS_INTEGRATION_ID = 15368
+
+ACTIONS_PERMISSIONS = {"allowed_actions": "all", "sha_pinning_required": True}
+WORKFLOW_PERMISSIONS = {
+    "default_workflow_permissions": "read",
+    "can_approve_pull_request_reviews": True,
+}
+
 env = Environment(
     loader=PackageLoader(PACKAGE_NAME, "templates"),
     keep_trailing_newline=True,
     extensions=["jinja2.ext.do"],
 )
 
+# manifest templates only receive the keys listed in their "context", using
+# another variable fails the render instead of producing an empty string
+plan_env = env.overlay(undefined=StrictUndefined, cache_size=400)
+
+
+# READMEs rarely change between runs, their templates are compiled once
+readme_templates = TemplateCache(env)
+
+
+def readme_template(
+    readme_contents: str | None, cache: TemplateCache = readme_templates
+) -> Template:
+    """Template regenerating the "template" blocks of an existing README, or the
+    default README template when the repository doesn't have one
+    """
+    if readme_contents is not None:
+        return cache.from_string(
+            GitRepositoryComponent.regenerate_readme_template(readme_contents)
+        )
+
+    return cache.environment.get_template(os.path.join("readme", "readme.md.j2"))
+
 
 class GitRepositoryComponent(pulumi.ComponentResource):
     def __init__(
@@ -32,6 +67,10 @@ class GitRepositoryComponent(pulumi.ComponentResource):
         branch_name: str | None = None,
         homepage_url: str | None = None,
         topics: list[str] | None = None,
+        remote: GithubApi | GitMirror | None = None,
+        file_store: bool = False,
+        template_cache: TemplateCache | None = None,
+        rate_limit: dict[str, Any] | None = None,
         props: Mapping[str, Any | Awaitable[Any] | Output[Any]] | None = None,
         opts: pulumi.ResourceOptions | None = None,
         dependency: bool = False,
@@ -47,6 +86,12 @@ class GitRepositoryComponent(pulumi.ComponentResource):
         :param branch_name: Repository branch used by pulumi
         :param homepage_url: Repository homepage
         :param topics: Repository topics
+        :param remote: Backend reading the files already in the repository
+        :param file_store: Keep only the digest of the managed files in the state,
+            their content is held in the local content addressed store
+        :param template_cache: Cache of the templates regenerated from the READMEs
+        :param rate_limit: RateLimiter arguments of the API calls made by the
+            program and its dynamic providers, None for the defaults
         :param pages: Repository pages
         """
 
@@ -56,6 +101,14 @@ class GitRepositoryComponent(pulumi.ComponentResource):
         self.author_fullname = author_fullname
         self.author_email = author_email
         self.branch_name = branch_name
+        self.rate_limit = rate_limit
+        self.remote = remote or GithubApi(
+            owner, RateLimiter(**rate_limit) if rate_limit else None
+        )
+        self.file_store = file_store
+        self.template_cache = template_cache or readme_templates
+        self.files: list[tuple[str, str, str]] = []
+        self.required_checks: list[tuple[str, int | None]] = []
 
         super().__init__(
             "pkg:index:GitRepositoryComponent", name, props, opts, dependency
@@ -122,7 +175,8 @@ class GitRepositoryComponent(pulumi.ComponentResource):
 
         self.register_outputs({"repository": self.repository.full_name})
 
-    def regenerate_readme_template(self, readme_contents: str) -> str:
+    @staticmethod
+    def regenerate_readme_template(readme_contents: str) -> str:
         pattern = r"<!-- template:begin:(.*?) -->(.*?)<!-- template:end:\1 -->"
         matches = re.findall(pattern, readme_contents, re.DOTALL)
 
@@ -144,29 +198,54 @@ class GitRepositoryComponent(pulumi.ComponentResource):
         else:
             return self.default_branch
 
-    def _repository_file(
+    def _repository_file(self, ressource_name_type: str, file: str, content: str):
+        self.files.append((ressource_name_type, file, content))
+
+    def register_files(self):
+        for ressource_name_type, file, content in self.files:
+            self._register_file(ressource_name_type, file, content)
+
+    def _register_file(
         self, ressource_name_type: str, file: str, content: str
-    ) -> github.RepositoryFile:
-        return github.RepositoryFile(
-            f"{self.name}-{file}",
-            repository=self.name,
-            branch=self.get_working_branch().branch,
-            file=file,
-            content=content,
-            commit_message=f"""\
+    ) -> github.RepositoryFile | StoredRepositoryFile:
+        commit_message = f"""\
 chore(git-sync): auto-applied {ressource_name_type}
 
 this file was auto-applied from pulumi
 located here:
     - https://github.com/{self.name}/.github
 
-Signed-off-by: {self.author_fullname} <{self.author_email}>""",
+Signed-off-by: {self.author_fullname} <{self.author_email}>"""
+        opts = pulumi.ResourceOptions(
+            depends_on=[self.repository, self.branch], parent=self
+        )
+
+        if self.file_store:
+            return StoredRepositoryFile(
+                f"{self.name}-{file}",
+                owner=self.owner,
+                repository=self.name,
+                branch=self.get_working_branch().branch,
+                file=file,
+                content=content,
+                commit_message=commit_message,
+                commit_author=self.author_fullname,
+                commit_email=self.author_email,
+                rate_limit=self.rate_limit,
+                opts=opts,
+            )
+
+        return github.RepositoryFile(
+            f"{self.name}-{file}",
+            repository=self.name,
+            branch=self.get_working_branch().branch,
+            file=file,
+            content=content,
+            commit_message=commit_message,
             commit_author=self.author_fullname,
             commit_email=self.author_email,
             overwrite_on_create=True,
-            opts=pulumi.ResourceOptions(
-                depends_on=[self.repository, self.branch], parent=self
-            ),
+            opts=opts,
         )
 
     def sync_repository_pages(self, pages: dict[str, str]):
@@ -181,159 +260,27 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
             repository=self.name,
         )
 
-    def sync_licence(self, licence_name: str):
-        license_dir = resources.files(PACKAGE_NAME).joinpath("license", licence_name)
-        for license_file in license_dir.iterdir():
-            with license_file.open() as file:
-                license_content = file.read()
-            self._repository_file("license", license_file.name, license_content)
-
-    def sync_funding(self, fundings: dict[str, str]):
-        template = env.get_template(os.path.join("misc", "FUNDING.yml.j2"))
-
-        self._repository_file(
-            "funding", ".github/FUNDING.yml", template.render(fundings=fundings)
-        )
-
-    def sync_contributing(self):
-        with (
-            resources.files(PACKAGE_NAME)
-            .joinpath("misc", "CONTRIBUTING.md")
-            .open() as file
-        ):
-            file_content = file.read()
-
-        self._repository_file(
-            "contributing",
-            "CONTRIBUTING.md",
-            file_content,
-        )
-
-    def sync_support(self):
-        with (
-            resources.files(PACKAGE_NAME).joinpath("misc", "SUPPORT.md").open() as file
-        ):
-            file_content = file.read()
-
-        self._repository_file(
-            "support",
-            "SUPPORT.md",
-            file_content,
-        )
-
-    def sync_pull_request_template(self):
-        template = env.get_template(os.path.join("misc", "PULL_REQUEST_TEMPLATE.md.j2"))
-
-        self._repository_file(
-            "pull_request_template",
-            ".github/PULL_REQUEST_TEMPLATE.md",
-            template.render(repositor_name={self.name}),
-        )
-
-    def sync_issue_template(self, language: str):
-        issue_config_dir = resources.files(PACKAGE_NAME).joinpath("templates", "issue")
-        for issue_file in issue_config_dir.iterdir():
-            template = env.get_template(os.path.join("issue", issue_file.name))
-            filename = os.path.splitext(issue_file.name)[0]
-
-            self._repository_file(
-                "issue_template",
-                f".github/ISSUE_TEMPLATE/{filename}",
-                template.render(assignees=[self.owner], language=language),
-            )
-
-    def sync_code_of_conduct(self, contact_email: str):
-        template = env.get_template(os.path.join("misc", "CODE_OF_CONDUCT.md.j2"))
-
-        self._repository_file(
-            "code_of_conduct",
-            "CODE_OF_CONDUCT.md",
-            template.render(contact_email=contact_email),
-        )
-
-    def sync_codeowner(self):
-        template = env.get_template(os.path.join("misc", "CODEOWNERS.j2"))
-
-        self._repository_file(
-            "codeowners", "CODEOWNERS", template.render(owner=self.owner)
-        )
-
-    def sync_vscode_config(self, language: str):
-        vscode_config_dir = resources.files(PACKAGE_NAME).joinpath(
-            "templates", "vscode"
-        )
-        for vscode_file in vscode_config_dir.iterdir():
-            template = env.get_template(os.path.join("vscode", vscode_file.name))
-            filename = os.path.splitext(vscode_file.name)[0]
-
-            self._repository_file(
-                filename,
-                f".vscode/{filename}",
-                template.render(language=language),
-            )
-
-    def sync_linter_config(self, language):
-        if language == "go":
-            with (
-                resources.files(PACKAGE_NAME)
-                .joinpath("linter", ".golangci.yaml")
-                .open() as file
-            ):
-                file_content = file.read()
-
-            self._repository_file(
-                "golangci",
-                ".golangci.yaml",
-                file_content,
-            )
-
-    def sync_editorconfig(self, language: str, docker: bool):
-        template = env.get_template(os.path.join("misc", "editorconfig.j2"))
-
-        self._repository_file(
-            "editorconfig",
-            ".editorconfig",
-            template.render(language=language, docker=docker),
-        )
-
-    def sync_gitattributes(self):
-        with (
-            resources.files(PACKAGE_NAME)
-            .joinpath("misc", "gitattributes")
-            .open() as file
-        ):
-            file_content = file.read()
-
-        self._repository_file("gitattributes", ".gitattributes", file_content)
-
-    def sync_gitignore(self, language: str, helm: bool, devenv: bool):
-        template = env.get_template(os.path.join("misc", "gitignore.j2"))
-
-        self._repository_file(
-            "gitignore",
-            ".gitignore",
-            template.render(language=language, helm=helm, devenv=devenv),
-        )
+    def sync_plan(
+        self,
+        plan: list[tuple[str, str, str | None, str | None, tuple[str, ...]]],
+        context: dict[str, Any],
+    ):
+        for ressource_name_type, file, content, template_name, keys in plan:
+            # repository specific templates are rendered here, others are shared
+            if content is None:
+                template = plan_env.get_template(template_name)
+                content = template.render({k: context[k] for k in keys})
 
-    def sync_security(self, security_email: str):
-        template = env.get_template(os.path.join("misc", "SECURITY.md.j2"))
-
-        self._repository_file(
-            "security",
-            "SECURITY.md",
-            template.render(
-                repository_name=f"{self.owner}/{self.name}",
-                security_email=security_email,
-            ),
-        )
+            self._repository_file(ressource_name_type, file, content)
 
     def sync_label(self, language: str, docker: bool, renovatebot: bool):
         labels = []
 
         template = env.get_template(os.path.join("misc", "labels.yml.j2"))
 
-        labels = yaml.safe_load(
-            template.render(language=language, docker=docker, renovatebot=renovatebot)
+        labels = yaml.load(
+            template.render(language=language, docker=docker, renovatebot=renovatebot),
+            Loader=YAML_LOADER,
         )
 
         github.IssueLabels(
@@ -350,74 +297,6 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
             opts=pulumi.ResourceOptions(depends_on=[self.repository], parent=self),
         )
 
-    def sync_renovatebot(
-        self,
-        schedule: str,
-        language: str,
-        configs: list[str],
-        additionnal_configs: list[str],
-    ):
-        template = env.get_template(os.path.join("renovatebot", "renovate.json5.j2"))
-
-        self._repository_file(
-            "renovate",
-            ".github/renovate.json5",
-            template.render(
-                repository_name=f"{self.owner}/{self.name}",
-                schedule=schedule,
-                configs=configs,
-                additionnal_configs=additionnal_configs,
-            ),
-        )
-
-        renovatebot_default_dir = resources.files(PACKAGE_NAME).joinpath(
-            "templates", "renovatebot", "default"
-        )
-        for renovatebot_file in renovatebot_default_dir.iterdir():
-            template = env.get_template(
-                os.path.join("renovatebot", "default", renovatebot_file.name)
-            )
-            filename = os.path.splitext(renovatebot_file.name)[0]
-
-            self._repository_file(
-                filename,
-                f".github/renovate/{filename}",
-                template.render(
-                    language=language,
-                    configs=configs,
-                    additionnal_configs=additionnal_configs,
-                ),
-            )
-
-        renovatebot_extras_dir = resources.files(PACKAGE_NAME).joinpath(
-            "templates", "renovatebot", "extras"
-        )
-        for renovatebot_file in renovatebot_extras_dir.iterdir():
-            template = env.get_template(
-                os.path.join("renovatebot", "extras", renovatebot_file.name)
-            )
-            filename = os.path.splitext(renovatebot_file.name)[0]
-
-            # ignore disabled extras
-            if not filename.startswith(tuple(configs)):
-                continue
-
-            self._repository_file(
-                filename,
-                f".github/renovate/{filename}",
-                template.render(
-                    language=language,
-                    configs=configs,
-                    additionnal_configs=additionnal_configs,
-                ),
-            )
-
-    def sync_logo(self, logo: str):
-        with resources.files(PACKAGE_NAME).joinpath("logo", logo).open() as file:
-            file_content = file.read()
-
-        self._repository_file("logo", "docs/assets/logo.svg", file_content)
-
     def sync_readme(
         self,
         repository_title: str,
@@ -435,17 +314,10 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
         configuration: bool,
     ):
         # check if a readme already exist
-        r = requests.get(
-            f"https://api.github.com/repos/{self.owner.lower()}/{self.name.lower()}/contents/README.md",
-            headers={
-                "Accept": "application/vnd.github.raw+json",
-                "Authorization": f"{os.environ['GITHUB_TOKEN']}",
-            },
+        readme_contents = self.remote.read_file(
+            self.name, self.default_branch_name, "README.md"
         )
-        if r.status_code == 200:
-            template = env.from_string(self.regenerate_readme_template(r.text))
-        else:
-            template = env.get_template(os.path.join("readme", "readme.md.j2"))
+        template = readme_template(readme_contents, self.template_cache)
 
         self._repository_file(
             "readme",
@@ -468,131 +340,7 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
             ),
         )
 
-    def sync_workflow(
-        self,
-        package_name: str,
-        language: str,
-        versions: list[str],
-        binary: bool,
-        build_target: str,
-        binary_platforms: list[dict[str, str]] | None,
-        workflow_lint: bool,
-        workflow_test: bool,
-        workflow_package: bool,
-        workflow_documentation: bool,
-        workflow_changelog: bool,
-        docker: bool,
-        docker_platforms: list[dict[str, str]] | None,
-    ):
-        template = env.get_template(
-            os.path.join("workflow", "validate-pr-title.yml.j2")
-        )
-        self._repository_file(
-            "workflow",
-            ".github/workflows/validate-pr-title.yml",
-            template.render(),
-        )
-
-        template = env.get_template(os.path.join("workflow", "scorecard.yml.j2"))
-        self._repository_file(
-            "workflow",
-            ".github/workflows/scorecard.yml",
-            template.render(),
-        )
-
-        template = env.get_template(os.path.join("workflow", "codeql.yml.j2"))
-        self._repository_file(
-            "workflow",
-            ".github/workflows/codeql.yml",
-            template.render(language=language),
-        )
-
-        template = env.get_template(
-            os.path.join("workflow", "dependency-review.yml.j2")
-        )
-        self._repository_file(
-            "workflow",
-            ".github/workflows/dependency-review.yml",
-            template.render(language=language),
-        )
-
-        template = env.get_template(os.path.join("workflow", "ai-generated.yml.j2"))
-        self._repository_file(
-            "workflow",
-            ".github/workflows/ai-generated.yml",
-            template.render(language=language),
-        )
-
-        template = env.get_template(os.path.join("workflow", "stale.yml.j2"))
-        self._repository_file(
-            "workflow",
-            ".github/workflows/stale.yml",
-            template.render(language=language),
-        )
-
-        if self.is_pr_mode():
-            template = env.get_template(
-                os.path.join("workflow", "automation-sync-pr.yml.j2")
-            )
-
-            self._repository_file(
-                "workflow",
-                ".github/workflows/automation-sync-pr.yml",
-                template.render(
-                    default_branch_name=self.default_branch_name,
-                    branch_name=self.branch_name,
-                ),
-            )
-
-        if workflow_lint or workflow_test or docker or binary:
-            template = env.get_template(os.path.join("workflow", "ci.yml.j2"))
-
-            self._repository_file(
-                "workflow",
-                ".github/workflows/ci.yml",
-                template.render(
-                    language=language,
-                    versions=versions,
-                    workflow_lint=workflow_lint,
-                    workflow_test=workflow_test,
-                    binary=binary,
-                    build_target=build_target,
-                    binary_platforms=binary_platforms,
-                    docker=docker,
-                    docker_platforms=docker_platforms,
-                ),
-            )
-
-        if workflow_changelog:
-            with (
-                resources.files(PACKAGE_NAME)
-                .joinpath("git-cliff", "cliff.toml")
-                .open() as file
-            ):
-                cliff_config = file.read()
-
-            self._repository_file("changelog", ".github/cliff.toml", cliff_config)
-
-        if workflow_package:
-            template = env.get_template(os.path.join("workflow", "release.yml.j2"))
-
-            self._repository_file(
-                "workflow",
-                ".github/workflows/release.yml",
-                template.render(
-                    language=language,
-                    package_name=package_name,
-                    build_target=build_target,
-                    binary_platforms=binary_platforms,
-                    workflow_package=workflow_package,
-                    workflow_documentation=workflow_documentation,
-                    workflow_changelog=workflow_changelog,
-                    docker=docker,
-                    docker_platforms=docker_platforms,
-                ),
-            )
-
-    def sync_repository_ruleset(
+    def set_required_checks(
         self,
         language: str,
         versions: list[str],
@@ -604,38 +352,20 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
         docker_platforms: list[dict[str, str]] | None,
     ):
         required_checks = [
-            github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                context="DCO"
-            ),
-            github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                context="Validate PR title", integration_id=15368
-            ),
-            github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                context=f"Analyze ({language})", integration_id=15368
-            ),
-            github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                context="Analyze (actions)", integration_id=15368
-            ),
-            github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                context="CodeQL", integration_id=57789
-            ),
-            github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                context="Dependency review", integration_id=15368
-            ),
+            ("DCO", None),
+            ("Validate PR title", GITHUB_ACTIONS_INTEGRATION_ID),
+            (f"Analyze ({language})", GITHUB_ACTIONS_INTEGRATION_ID),
+            ("Analyze (actions)", GITHUB_ACTIONS_INTEGRATION_ID),
+            ("CodeQL", 57789),
+            ("Dependency review", GITHUB_ACTIONS_INTEGRATION_ID),
         ]
 
         if lint:
-            required_checks.append(
-                github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                    context="Lint", integration_id=15368
-                )
-            )
+            required_checks.append(("Lint", GITHUB_ACTIONS_INTEGRATION_ID))
         if test:
             for version in versions:
                 required_checks.append(
-                    github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                        context=f"Test ({version})", integration_id=15368
-                    ),
+                    (f"Test ({version})", GITHUB_ACTIONS_INTEGRATION_ID)
                 )
         if binary and binary_platforms:
             for platform in binary_platforms:
@@ -646,20 +376,27 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
                         f"{platform['os']}, {platform['arch']}, {platform['runner']}"
                     )
                 required_checks.append(
-                    github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                        context=f"Build binary ({matrix_context})",
-                        integration_id=15368,
-                    ),
+                    (f"Build binary ({matrix_context})", GITHUB_ACTIONS_INTEGRATION_ID)
                 )
         if docker and docker_platforms:
             for platform in docker_platforms:
                 required_checks.append(
-                    github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
-                        context=f"Build docker ({platform['os']}, {platform['arch']}, {platform['runner']})",
-                        integration_id=15368,
-                    ),
+                    (
+                        f"Build docker ({platform['os']}, {platform['arch']}, {platform['runner']})",
+                        GITHUB_ACTIONS_INTEGRATION_ID,
+                    )
                 )
 
+        self.required_checks = required_checks
+
+    def workflow_checks(self) -> list[str]:
+        return [
+            context
+            for context, integration_id in self.required_checks
+            if integration_id == GITHUB_ACTIONS_INTEGRATION_ID
+        ]
+
+    def sync_repository_ruleset(self):
         github.RepositoryRuleset(
             f"{self.name}-ruleset",
             name="automation-sync",
@@ -693,7 +430,12 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
                     required_review_thread_resolution=True,
                 ),
                 required_status_checks=github.RepositoryRulesetRulesRequiredStatusChecksArgs(
-                    required_checks=required_checks,
+                    required_checks=[
+                        github.RepositoryRulesetRulesRequiredStatusChecksRequiredCheckArgs(
+                            context=context, integration_id=integration_id
+                        )
+                        for context, integration_id in self.required_checks
+                    ],
                     strict_required_status_checks_policy=True,
                 ),
                 required_code_scanning=github.RepositoryRulesetRulesRequiredCodeScanningArgs(
@@ -711,18 +453,12 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
 
     def sync_action_repository_permission(self):
         github.ActionsRepositoryPermissions(
-            f"{self.name}-permission",
-            allowed_actions="all",
-            sha_pinning_required=True,
-            repository=self.name,
+            f"{self.name}-permission", repository=self.name, **ACTIONS_PERMISSIONS
         )
 
     def sync_workflow_repository_permission(self):
         github.WorkflowRepositoryPermissions(
-            f"{self.name}-permission",
-            default_workflow_permissions="read",
-            can_approve_pull_request_reviews=True,
-            repository=self.name,
+            f"{self.name}-permission", repository=self.name, **WORKFLOW_PERMISSIONS
         )
 
     def sync_vulnerability_alerts(self):
@@ -732,6 +468,35 @@ Signed-off-by: {self.author_fullname} <{self.author_email}>""",
             repository=self.name,
         )
 
+    def sync_repository_settings(
+        self, pages: dict[str, str] | None, actions: bool = True
+    ):
+        """Batched alternative to sync_action_repository_permission,
+        sync_workflow_repository_permission, sync_vulnerability_alerts and
+        sync_repository_pages, a single resource for all of them
+
+        :param pages: Repository pages
+        :param actions: Manage the actions permissions, False when they are
+            organization defaults
+        """
+        RepositorySettings(
+            f"{self.name}-settings",
+            owner=self.owner,
+            repository=self.name,
+            actions=ACTIONS_PERMISSIONS if actions else None,
+            workflow=WORKFLOW_PERMISSIONS if actions else None,
+            dependabot_security_updates=False,
+            pages={
+                "source": {"branch": pages["branch"], "path": pages["path"]},
+                "cname": pages["cname"],
+                "https_enforced": True,
+            }
+            if pages
+            else None,
+            rate_limit=self.rate_limit,
+            opts=pulumi.ResourceOptions(depends_on=[self.repository], parent=self),
+        )
+
     def sync_app_installation(
         self, renovatebot: bool, app_installation_ids: dict[str, str]
     ):
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import runpy
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+from unittest import mock
+
+import pulumi
+import yaml
+
+from git_automation.git_repository_component import GitRepositoryComponent
+
+
+class _Mocks(pulumi.runtime.Mocks):
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs) -> tuple[str, dict]:
+        return f"{args.name}_id", args.inputs
+
+    def call(self, args: pulumi.runtime.MockCallArgs) -> dict:
+        return {}
+
+
+def load_stack_config(stack: str, project_dir: str = ".") -> tuple[str, dict[str, Any]]:
+    """Read the project name and the plain (non secret) config of a stack
+
+    :param stack: Stack name
+    :param project_dir: Directory containing Pulumi.yaml
+    """
+    with open(os.path.join(project_dir, "Pulumi.yaml")) as file:
+        project = yaml.safe_load(file)
+    with open(os.path.join(project_dir, f"Pulumi.{stack}.yaml")) as file:
+        stack_config = yaml.safe_load(file).get("config", {})
+
+    config = {}
+    for key, value in {**project.get("config", {}), **stack_config}.items():
+        if isinstance(value, dict) and "value" in value:
+            value = value["value"]
+        if key.startswith("pulumi:") or (isinstance(value, dict) and "secure" in value):
+            continue
+        if ":" not in key:
+            key = f"{project['name']}:{key}"
+        config[key] = value
+
+    return project["name"], config
+
+
+def run_program(program: str, stack: str) -> dict[str, Any]:
+    """Run the Pulumi program against the mock runtime, GitHub is never reached
+
+    :param program: Path of the Pulumi program
+    :param stack: Stack whose config is used
+    """
+    project, config = load_stack_config(stack, os.path.dirname(program) or ".")
+
+    pulumi.runtime.set_mocks(_Mocks(), project=project, stack=stack, preview=False)
+    pulumi.runtime.set_all_config(
+        {k: v if isinstance(v, str) else json.dumps(v) for k, v in config.items()}
+    )
+
+    os.environ.setdefault("GITHUB_TOKEN", "")
+    # every repository is seen as having no README yet
+    with mock.patch(
+        "requests.request", return_value=mock.Mock(status_code=404, headers={})
+    ):
+        program_globals = runpy.run_path(program, run_name="__main__")
+
+        # wait for the resource registrations still pending
+        loop = asyncio.get_event_loop()
+        while tasks := [task for task in asyncio.all_tasks(loop) if not task.done()]:
+            loop.run_until_complete(asyncio.wait(tasks))
+
+    return program_globals
+
+
+def _component_methods() -> list[str]:
+    return ["__init__", "register_files"] + sorted(
+        name for name in vars(GitRepositoryComponent) if name.startswith("sync_")
+    )
+
+
+@contextmanager
+def instrument(
+    before: Callable[[str, str], None], after: Callable[[str, str], None]
+) -> Iterator[None]:
+    """Call before/after with (repository name, method name) around every
+    GitRepositoryComponent sync method, __init__ marks a new repository
+    """
+
+    def wrap(method_name: str, method: Callable) -> Callable:
+        def wrapper(self, *args, **kwargs):
+            # the name isn't set yet when __init__ starts
+            name = kwargs.get("name", getattr(self, "name", None))
+            before(name, method_name)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                after(name, method_name)
+
+        return wrapper
+
+    originals = {
+        name: vars(GitRepositoryComponent)[name] for name in _component_methods()
+    }
+    for name, method in originals.items():
+        setattr(GitRepositoryComponent, name, wrap(name, method))
+    try:
+        yield
+    finally:
+        for name, method in originals.items():
+            setattr(GitRepositoryComponent, name, method)
@@ -0,0 +1,298 @@
+import fnmatch
+import json
+import posixpath
+import string
+from collections.abc import Iterable, Iterator
+from importlib import resources
+from typing import Any
+
+import yaml
+
+from git_automation.assets import optimize_asset
+from git_automation.git_repository_component import PACKAGE_NAME, env, plan_env
+from git_automation.validation import YAML_LOADER
+
+# keys whose value is unique to a repository, they are left out of the profile
+REPOSITORY_KEYS = ("repository_name", "package_name", "schedule", "additionnal_configs")
+
+_BUILD_TARGET = {"go": "main.go", "rust": "bin"}
+
+_BUILD_PLATFORMS = {
+    "docker": [
+        {"os": "linux", "arch": "amd64", "runner": "ubuntu-24.04"},
+        {"os": "linux", "arch": "arm64", "runner": "ubuntu-24.04-arm"},
+    ],
+    "go": [
+        {"os": "linux", "arch": "amd64", "runner": "ubuntu-24.04"},
+        {"os": "linux", "arch": "arm64", "runner": "ubuntu-24.04-arm"},
+        {"os": "darwin", "arch": "amd64", "runner": "macos-15-intel"},
+        {"os": "darwin", "arch": "arm64", "runner": "macos-15"},
+        {"os": "windows", "arch": "amd64", "runner": "windows-2025"},
+        {"os": "windows", "arch": "arm64", "runner": "windows-11-arm"},
+    ],
+    "rust": [
+        {"target": "x86_64-unknown-linux-gnu", "runner": "ubuntu-24.04"},
+        {"target": "x86_64-unknown-linux-musl", "runner": "ubuntu-24.04"},
+        {"target": "aarch64-unknown-linux-gnu", "runner": "ubuntu-24.04-arm"},
+        {"target": "aarch64-unknown-linux-musl", "runner": "ubuntu-24.04-arm"},
+        {"target": "x86_64-apple-darwin", "runner": "macos-15-intel"},
+        {"target": "aarch64-apple-darwin", "runner": "macos-15"},
+        {"target": "x86_64-pc-windows-msvc", "runner": "windows-2025"},
+        {"target": "x86_64-pc-windows-gnu", "runner": "windows-2025"},
+        {"target": "aarch64-pc-windows-msvc", "runner": "windows-11-arm"},
+    ],
+}
+
+PlanEntry = tuple[str, str, str | None, str | None, tuple[str, ...]]
+
+
+def repository_context(
+    repository_config: dict[str, Any], settings: dict[str, Any]
+) -> dict[str, Any]:
+    """Values read by the manifest conditions and templates for a repository
+
+    :param repository_config: Repository entry of the stack configuration
+    :param settings: Stack wide values (owner, default_branch_name, branch_name,
+        funding, contact_email, security_email)
+    """
+    workflow_config = repository_config.get("workflow") or {}
+    language = repository_config.get("language", None)
+    package_name = repository_config.get("package", None)
+    docker = repository_config.get("docker", False)
+    helm = repository_config.get("helm_chart_name", None) is not None
+    devcontainer = repository_config.get("devcontainer", False)
+    renovatebot_config = repository_config.get("renovatebot")
+
+    configs = []
+    if renovatebot_config is not None:
+        configs = list(renovatebot_config.get("configs", []))
+
+        if devcontainer and "devcontainer" not in configs:
+            configs.append("devcontainer")
+        if helm and "helm" not in configs:
+            configs.append("helm")
+        if docker and "docker" not in configs:
+            configs.append("docker")
+        configs.append(language)
+
+    branch_name = settings.get("branch_name")
+    default_branch_name = settings["default_branch_name"]
+
+    return {
+        "repository_name": f"{settings['owner']}/{repository_config['name']}",
+        "owner": settings["owner"],
+        "assignees": [settings["owner"]],
+        "default_branch_name": default_branch_name,
+        "branch_name": branch_name,
+        "pr_mode": bool(branch_name and branch_name != default_branch_name),
+        "fundings": settings.get("funding"),
+        "contact_email": settings.get("contact_email"),
+        "security_email": settings.get("security_email"),
+        "license": repository_config.get("license"),
+        "logo": repository_config.get("logo"),
+        "language": language,
+        "versions": repository_config.get("versions", []),
+        "package_name": package_name,
+        "binary": bool(language in ["rust", "go"] and package_name),
+        "build_target": repository_config.get(
+            "build_target", _BUILD_TARGET.get(language, None)
+        ),
+        "binary_platforms": _BUILD_PLATFORMS.get(language, None),
+        "docker": docker,
+        "docker_platforms": _BUILD_PLATFORMS["docker"] if docker else None,
+        "helm": helm,
+        "devenv": repository_config.get("devenv", False),
+        "devcontainer": devcontainer,
+        "gitignore": repository_config.get("gitignore", False),
+        "workflow": "workflow" in repository_config,
+        "workflow_lint": bool(workflow_config.get("lint")),
+        "workflow_test": bool(workflow_config.get("test")),
+        "workflow_package": bool(workflow_config.get("package")),
+        "workflow_changelog": bool(workflow_config.get("changelog")),
+        "workflow_documentation": bool(workflow_config.get("documentation")),
+        "renovatebot": renovatebot_config is not None,
+        "configs": configs,
+        "schedule": (renovatebot_config or {}).get("schedule", None),
+        "additionnal_configs": (renovatebot_config or {}).get(
+            "additionnal_configs", []
+        ),
+    }
+
+
+def readme_context(
+    repository_config: dict[str, Any], context: dict[str, Any]
+) -> dict[str, Any]:
+    """Arguments of GitRepositoryComponent.sync_readme for a repository
+
+    :param repository_config: Repository entry of the stack configuration
+    :param context: Repository context built by repository_context
+    """
+    readme = repository_config.get("readme", False)
+    readme_args = {} if isinstance(readme, bool) else readme
+    dev = []
+
+    if context["devenv"]:
+        dev.append("devenv")
+    if context["devcontainer"]:
+        dev.append("devcontainer")
+
+    return {
+        "repository_title": repository_config["title"],
+        "repository_description": repository_config["description"],
+        "documentation_url": repository_config.get("documentation_url", None),
+        "logo": context["logo"] is not None,
+        "language": context["language"],
+        "package_name": context["package_name"],
+        "workflow_lint": context["workflow_lint"],
+        "workflow_test": context["workflow_test"],
+        "docker": readme_args.get("docker", context["docker"]),
+        "helm": context["helm"],
+        "helm_chart_name": repository_config.get("helm_chart_name", None),
+        "dev": dev,
+        "configuration": readme_args.get("configuration", True),
+    }
+
+
+def profile_key(context: dict[str, Any]) -> str:
+    return json.dumps(
+        {k: v for k, v in context.items() if k not in REPOSITORY_KEYS},
+        sort_keys=True,
+    )
+
+
+def load_manifest() -> list[dict[str, Any]]:
+    with resources.files(PACKAGE_NAME).joinpath("manifest.yml").open() as file:
+        manifest = yaml.load(file, Loader=YAML_LOADER)
+
+    for entry in manifest:
+        if ("template" in entry) == ("source" in entry):
+            raise ValueError(
+                f"Manifest entry {entry['file']} needs either a template or a source"
+            )
+
+    return manifest
+
+
+def _list_dir(path: str, template: bool) -> list[str]:
+    if template:
+        return [
+            posixpath.basename(name)
+            for name in env.list_templates()
+            if posixpath.dirname(name) == path
+        ]
+
+    return [
+        file.name
+        for file in resources.files(PACKAGE_NAME).joinpath(*path.split("/")).iterdir()
+    ]
+
+
+def _expand(entry: dict[str, Any], profile: dict[str, Any]) -> list[tuple[str, str]]:
+    """Resolve the entry template/source to (path, name) couples"""
+    template = "template" in entry
+    path = entry["template" if template else "source"]
+
+    # nothing to push when a placeholder isn't set for this profile
+    placeholders = [field for _, field, _, _ in string.Formatter().parse(path) if field]
+    if not all(profile.get(placeholder) for placeholder in placeholders):
+        return []
+
+    path = path.format(**profile)
+    directory, pattern = posixpath.split(path)
+
+    if "*" in pattern:
+        filenames = sorted(fnmatch.filter(_list_dir(directory, template), pattern))
+    else:
+        filenames = [pattern]
+
+    return [
+        (
+            posixpath.join(directory, filename),
+            filename.removesuffix(".j2") if template else filename,
+        )
+        for filename in filenames
+    ]
+
+
+def read_source(path: str) -> str:
+    # line endings are normalized by the asset pipeline
+    with (
+        resources.files(PACKAGE_NAME)
+        .joinpath(*path.split("/"))
+        .open(encoding="utf-8", newline="") as file
+    ):
+        return optimize_asset(path, file.read())
+
+
+def compile_conditions(manifest: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        entry["when"]: env.compile_expression(entry["when"])
+        for entry in manifest
+        if "when" in entry
+    }
+
+
+def expand_manifest(
+    manifest: list[dict[str, Any]],
+    conditions: dict[str, Any],
+    profile: dict[str, Any],
+) -> Iterator[tuple[dict[str, Any], str, str, str]]:
+    """Yield (entry, ressource name type, destination file, template/source path)
+    for every file of the manifest pushed with this profile
+    """
+    for entry in manifest:
+        for path, name in _expand(entry, profile):
+            if "when" in entry and not conditions[entry["when"]](**profile, name=name):
+                continue
+
+            yield (
+                entry,
+                entry["type"].format(name=name),
+                entry["file"].format(name=name),
+                path,
+            )
+
+
+def compile_plans(
+    manifest: list[dict[str, Any]], contexts: Iterable[dict[str, Any]]
+) -> dict[str, list[PlanEntry]]:
+    """Build the list of files pushed for every distinct profile
+
+    Files that don't depend on a repository specific key are rendered once and
+    shared by every profile they appear in, the other ones are left to
+    GitRepositoryComponent.sync_plan.
+    """
+    conditions = compile_conditions(manifest)
+    rendered = {}
+    plans = {}
+
+    for context in contexts:
+        key = profile_key(context)
+        if key in plans:
+            continue
+
+        profile = json.loads(key)
+        plan = []
+        for entry, ressource_name_type, file, path in expand_manifest(
+            manifest, conditions, profile
+        ):
+            keys = tuple(entry.get("context", []))
+
+            if "source" in entry:
+                if path not in rendered:
+                    rendered[path] = read_source(path)
+                plan.append((ressource_name_type, file, rendered[path], None, keys))
+            elif set(keys) & set(REPOSITORY_KEYS):
+                plan.append((ressource_name_type, file, None, path, keys))
+            else:
+                values = {k: profile[k] for k in keys}
+                render_key = (path, json.dumps(values, sort_keys=True))
+                if render_key not in rendered:
+                    rendered[render_key] = plan_env.get_template(path).render(values)
+                plan.append(
+                    (ressource_name_type, file, rendered[render_key], path, keys)
+                )
+
+        plans[key] = plan
+
+    return plans
@@ -0,0 +1,102 @@
+"""Memory profile of the Pulumi program run against the mock runtime
+
+    python -m git_automation.memory_profile --stack prod --max-bytes-per-repository 2000000
+
+tracemalloc snapshots are taken around every GitRepositoryComponent sync method,
+the top allocation sites of each method and the memory growth per repository are
+reported. The growth of a repository adds up the memory retained by its own
+method calls, work done once for every repository (e.g. the validation) is
+reported apart. The exit code is 1 when a repository grows the traced memory by
+more than --max-bytes-per-repository.
+"""
+
+import argparse
+import sys
+import tracemalloc
+from collections import defaultdict
+
+from git_automation.harness import instrument, run_program
+
+# filtering the snapshots themselves is much slower than skipping the stats
+_IGNORED_FILES = (
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--program", default="__main__.py")
+    parser.add_argument("--stack", default="prod")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--max-bytes-per-repository", type=int, default=None)
+    args = parser.parse_args()
+
+    repository_growths: dict[str, int] = defaultdict(int)
+    starts: list[int] = []
+    method_sizes: dict[str, int] = defaultdict(int)
+    method_sites: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    snapshots: list[tracemalloc.Snapshot] = []
+
+    def before(repository: str, method: str):
+        # nested calls are already counted by the outermost one
+        if not snapshots:
+            starts.append(tracemalloc.get_traced_memory()[0])
+        snapshots.append(tracemalloc.take_snapshot())
+
+    def after(repository: str, method: str):
+        snapshot = tracemalloc.take_snapshot()
+        for stat in snapshot.compare_to(snapshots.pop(), "lineno"):
+            if stat.size_diff > 0 and stat.traceback[0].filename not in _IGNORED_FILES:
+                method_sizes[method] += stat.size_diff
+                method_sites[method][f"{stat.traceback[0]}"] += stat.size_diff
+
+        # measured once the snapshots are released
+        del snapshot
+        if not snapshots:
+            growth = tracemalloc.get_traced_memory()[0] - starts.pop()
+            repository_growths[repository] += growth
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    with instrument(before, after):
+        run_program(args.program, args.stack)
+    end, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{'method':<40} {'allocated':>12}")
+    for method, size in sorted(method_sizes.items(), key=lambda item: -item[1]):
+        print(f"{method:<40} {size:>12}")
+        for site, site_size in sorted(
+            method_sites[method].items(), key=lambda item: -item[1]
+        )[: args.top]:
+            print(f"    {site_size:>12}  {site}")
+
+    print(f"\n{'repository':<40} {'growth':>12}")
+    for repository, growth in repository_growths.items():
+        print(f"{repository:<40} {growth:>12}")
+    print(f"{'(program)':<40} {end - start - sum(repository_growths.values()):>12}")
+
+    print(f"\npeak: {peak} bytes")
+
+    over = [
+        repository
+        for repository, growth in repository_growths.items()
+        if args.max_bytes_per_repository is not None
+        and growth > args.max_bytes_per_repository
+    ]
+    if over:
+        print(
+            f"memory of {', '.join(over)} is above "
+            f"{args.max_bytes_per_repository} bytes",
+            file=sys.stderr,
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
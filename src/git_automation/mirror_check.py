@@ -0,0 +1,130 @@
+"""Check the git mirror backend against local bare repositories
+
+    python -m git_automation.mirror_check
+
+Nothing is fetched from GitHub, the remotes are bare repositories created in a
+temporary directory and mirrored through file:// urls. The exit code is 1 when
+a check fails.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from git_automation.remote import GitMirror
+
+
+def _git(*args: str) -> None:
+    subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+def _remote(directory: str, name: str, readme: str) -> None:
+    """Bare repository whose main branch holds a README"""
+    work = os.path.join(directory, "work", name)
+    _git("init", "--quiet", "--initial-branch=main", work)
+    with open(os.path.join(work, "README.md"), "w") as file:
+        file.write(readme)
+    _git("-C", work, "add", "README.md")
+    _git(
+        "-C",
+        work,
+        "-c",
+        "user.name=mirror-check",
+        "-c",
+        "user.email=mirror-check@localhost",
+        "commit",
+        "--quiet",
+        "--message=readme",
+    )
+    _git("clone", "--quiet", "--bare", work, os.path.join(directory, f"{name}.git"))
+
+
+def _blob_sha(content: str) -> str:
+    return (
+        subprocess.run(
+            ["git", "hash-object", "--stdin"],
+            input=content.encode(),
+            check=True,
+            capture_output=True,
+        )
+        .stdout.decode()
+        .strip()
+    )
+
+
+def main() -> int:
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    failures = []
+
+    def check(description: str, actual: object, expected: object):
+        if actual == expected:
+            print(f"ok    {description}")
+        else:
+            print(f"FAIL  {description}: {actual!r} != {expected!r}")
+            failures.append(description)
+
+    with tempfile.TemporaryDirectory() as directory:
+        remotes = os.path.join(directory, "remotes")
+        moved = os.path.join(directory, "moved")
+        mirrors = os.path.join(directory, "mirrors")
+        _remote(remotes, "first", "first\n")
+        _remote(remotes, "second", "second\n")
+        _remote(moved, "first", "moved\n")
+
+        mirror = GitMirror("owner", url=f"file://{remotes}/{{name}}.git", path=mirrors)
+        mirror.refresh(["first"], "main")
+        check("read a file", mirror.read_file("first", "main", "README.md"), "first\n")
+        check(
+            "read a blob sha",
+            mirror.blob_sha("first", "main", "README.md"),
+            _blob_sha("first\n"),
+        )
+        check(
+            "read a missing blob sha",
+            mirror.blob_sha("first", "main", "MISSING.md"),
+            None,
+        )
+        check(
+            "read a missing file",
+            mirror.read_file("first", "main", "MISSING.md"),
+            None,
+        )
+
+        mirror.refresh(["first"], "missing")
+        check(
+            "read a missing branch",
+            mirror.read_file("first", "missing", "README.md"),
+            None,
+        )
+
+        # a run killed between the init and the remote creation
+        _git("init", "--quiet", "--bare", os.path.join(mirrors, "second.git"))
+        mirror.refresh(["second"], "main")
+        check(
+            "repair a mirror without origin",
+            mirror.read_file("second", "main", "README.md"),
+            "second\n",
+        )
+
+        mirror = GitMirror("owner", url=f"file://{moved}/{{name}}.git", path=mirrors)
+        mirror.refresh(["first"], "main")
+        check(
+            "follow a changed url",
+            mirror.read_file("first", "main", "README.md"),
+            "moved\n",
+        )
+
+        try:
+            mirror.refresh(["unknown"], "main")
+        except RuntimeError:
+            check("fail on an unreachable remote", True, True)
+        else:
+            check("fail on an unreachable remote", False, True)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import json
+from collections.abc import Iterable
+
+import pulumi
+import pulumi_github as github
+
+from git_automation.cache import digest
+from git_automation.git_repository_component import (
+    ACTIONS_PERMISSIONS,
+    WORKFLOW_PERMISSIONS,
+    GitRepositoryComponent,
+)
+
+
+def sync_organization_rulesets(repositories: Iterable[GitRepositoryComponent]):
+    """Register one organization ruleset per distinct set of required checks
+
+    Repositories sharing the same checks (same language, versions, platforms...)
+    are targeted by name from a single ruleset instead of one ruleset each.
+    """
+    groups: dict[tuple[tuple[str, int | None], ...], list[GitRepositoryComponent]] = {}
+    for repository in repositories:
+        groups.setdefault(tuple(repository.required_checks), []).append(repository)
+
+    for required_checks, members in groups.items():
+        # named after the checks so that the ruleset is stable across runs
+        name = f"automation-sync-{digest(json.dumps(required_checks))[:8]}"
+
+        github.OrganizationRuleset(
+            name,
+            name=name,
+            target="branch",
+            enforcement="active",
+            conditions=github.OrganizationRulesetConditionsArgs(
+                ref_name=github.OrganizationRulesetConditionsRefNameArgs(
+                    includes=["~DEFAULT_BRANCH"], excludes=[]
+                ),
+                repository_name=github.OrganizationRulesetConditionsRepositoryNameArgs(
+                    includes=sorted(repository.name for repository in members),
+                    excludes=[],
+                ),
+            ),
+            bypass_actors=[
+                github.OrganizationRulesetBypassActorArgs(
+                    actor_id=5,
+                    actor_type="RepositoryRole",
+                    bypass_mode="always",
+                )
+            ],
+            rules=github.OrganizationRulesetRulesArgs(
+                creation=False,
+                update=False,
+                deletion=True,
+                non_fast_forward=True,
+                required_linear_history=True,
+                required_signatures=True,
+                pull_request=github.OrganizationRulesetRulesPullRequestArgs(
+                    required_approving_review_count=1,
+                    dismiss_stale_reviews_on_push=True,
+                    require_code_owner_review=True,
+                    require_last_push_approval=True,
+                    required_review_thread_resolution=True,
+                ),
+                required_status_checks=github.OrganizationRulesetRulesRequiredStatusChecksArgs(
+                    required_checks=[
+                        github.OrganizationRulesetRulesRequiredStatusChecksRequiredCheckArgs(
+                            context=context, integration_id=integration_id
+                        )
+                        for context, integration_id in required_checks
+                    ],
+                    strict_required_status_checks_policy=True,
+                ),
+                required_code_scanning=github.OrganizationRulesetRulesRequiredCodeScanningArgs(
+                    required_code_scanning_tools=[
+                        github.OrganizationRulesetRulesRequiredCodeScanningRequiredCodeScanningToolArgs(
+                            alerts_threshold="errors_and_warnings",
+                            security_alerts_threshold="medium_or_higher",
+                            tool="CodeQL",
+                        )
+                    ]
+                ),
+            ),
+            opts=pulumi.ResourceOptions(
+                depends_on=[repository.repository for repository in members]
+            ),
+        )
+
+
+def sync_organization_settings(owner: str):
+    """Register the actions and workflow permissions as organization defaults,
+    inherited by every repository instead of one resource each
+
+    Dependabot security updates and pages have no organization default applying
+    to existing repositories, see GitRepositoryComponent.sync_repository_settings.
+    """
+    github.ActionsOrganizationPermissions(
+        "organization-permission", enabled_repositories="all", **ACTIONS_PERMISSIONS
+    )
+
+    github.ActionsOrganizationWorkflowPermissions(
+        "organization-workflow-permission",
+        organization_slug=owner,
+        **WORKFLOW_PERMISSIONS,
+    )
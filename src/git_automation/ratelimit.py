@@ -0,0 +1,141 @@
+import fcntl
+import json
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import requests
+
+from git_automation.cache import cache_path, digest
+
+# GitHub asks to wait at least a minute after a secondary rate limit without
+# retry-after header
+_SECONDARY_RATE_LIMIT_DELAY = 60
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 10,
+        reserve: int = 500,
+        path: str | None = None,
+    ) -> None:
+        """Token bucket pacing the GitHub API calls, shared by every process and
+        thread using the same token through a state file locked with flock
+
+        :param rate: Maximum number of requests per second
+        :param burst: Number of requests that can be sent at once
+        :param reserve: Below this number of remaining requests, the remaining
+            budget is spread until the rate limit window resets
+        :param path: State file, defaults to one per token in the cache directory
+        """
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.path = path or cache_path(
+            "ratelimit", f"{digest(os.environ.get('GITHUB_TOKEN', ''))}.json"
+        )
+
+    @contextmanager
+    def _state(self) -> Iterator[dict[str, Any]]:
+        with open(self.path, "a+") as file:
+            # released when the file is closed
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.seek(0)
+            try:
+                state = json.loads(file.read() or "{}")
+            except ValueError:
+                state = {}
+
+            yield state
+
+            file.seek(0)
+            file.truncate()
+            json.dump(state, file)
+
+    def _take(self, state: dict[str, Any], now: float) -> float:
+        """Take a token from the bucket, or return the delay before retrying"""
+        if state.get("blocked_until", 0) > now:
+            return state["blocked_until"] - now
+
+        rate = self.rate
+        remaining = state.get("remaining")
+        if remaining is not None and state["reset"] <= now:
+            # the rate limit window has been reset
+            del state["remaining"], state["reset"]
+            remaining = None
+
+        if remaining is not None:
+            if remaining <= 0:
+                return state["reset"] - now
+            if remaining <= self.reserve:
+                rate = min(rate, remaining / (state["reset"] - now))
+
+        tokens = state.get("tokens", self.burst)
+        tokens = min(self.burst, tokens + (now - state.get("updated", now)) * rate)
+        state["updated"] = now
+
+        if tokens < 1:
+            state["tokens"] = tokens
+            return (1 - tokens) / rate
+
+        state["tokens"] = tokens - 1
+        if remaining is not None:
+            state["remaining"] = remaining - 1
+
+        return 0
+
+    def acquire(self) -> None:
+        """Block until a request can be sent"""
+        while True:
+            with self._state() as state:
+                delay = self._take(state, time.time())
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def update(self, response: requests.Response) -> bool:
+        """Record the rate limit headers of a response
+
+        :param response: GitHub API response
+        :return: True when the request was rejected by a rate limit and must be
+            sent again
+        """
+        headers = response.headers
+        now = time.time()
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        exhausted = remaining == "0"
+        # a secondary rate limit can come without retry-after and with requests
+        # left in the primary budget, only its message tells it apart
+        secondary = (
+            response.status_code == 403
+            and "secondary rate limit" in response.text.lower()
+        )
+        limited = response.status_code == 429 or (
+            response.status_code == 403
+            and (exhausted or retry_after is not None or secondary)
+        )
+
+        with self._state() as state:
+            if remaining is not None and reset is not None:
+                remaining, reset = int(remaining), float(reset)
+                # responses of concurrent requests can arrive out of order
+                if state.get("reset") == reset:
+                    remaining = min(remaining, state["remaining"])
+                state.update(remaining=remaining, reset=reset)
+
+            if retry_after is not None:
+                blocked_until = now + float(retry_after)
+            # an exhausted budget is waited for until the reset in _take
+            elif limited and not exhausted:
+                blocked_until = now + _SECONDARY_RATE_LIMIT_DELAY
+            else:
+                blocked_until = 0
+            state["blocked_until"] = max(state.get("blocked_until", 0), blocked_until)
+
+        return limited
@@ -0,0 +1,178 @@
+import base64
+import os
+import subprocess
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import requests
+
+from git_automation.cache import CACHE_DIR
+from git_automation.ratelimit import RateLimiter
+
+# git fetch errors meaning that there is nothing to read yet, any other error
+# (e.g. a broken mirror) must not be mistaken for a missing README
+_MISSING_REMOTE = (
+    b"couldn't find remote ref",
+    b"Repository not found",
+)
+
+
+class GithubApi:
+    def __init__(self, owner: str, rate_limiter: RateLimiter | None = None) -> None:
+        """Read the files of the remote repositories through the GitHub REST API
+
+        :param owner: Git owner
+        :param rate_limiter: Rate limiter pacing the calls
+        """
+        self.owner = owner
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Call the GitHub REST API, paced by the rate limiter
+
+        :param method: HTTP method
+        :param path: Path relative to https://api.github.com/
+        """
+        headers = {
+            "Authorization": f"Bearer {os.environ['GITHUB_TOKEN']}",
+            **kwargs.pop("headers", {}),
+        }
+
+        while True:
+            self.rate_limiter.acquire()
+            r = requests.request(
+                method, f"https://api.github.com/{path}", headers=headers, **kwargs
+            )
+            if not self.rate_limiter.update(r):
+                return r
+
+    def read_file(self, name: str, branch: str, path: str) -> str | None:
+        r = self.request(
+            "GET",
+            f"repos/{self.owner.lower()}/{name.lower()}/contents/{path}",
+            params={"ref": branch},
+            headers={"Accept": "application/vnd.github.raw+json"},
+        )
+        # any other error must not be mistaken for a missing file, the README
+        # would be replaced by the default template
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+
+        return r.text
+
+
+def provider_api(props: dict[str, Any]) -> GithubApi:
+    """GithubApi of a dynamic provider, paced with the rate_limit of its props
+
+    :param props: Resource props, with owner and the RateLimiter arguments
+        as rate_limit (None for the defaults)
+    """
+    rate_limit = props.get("rate_limit")
+
+    return GithubApi(props["owner"], RateLimiter(**rate_limit) if rate_limit else None)
+
+
+class GitMirror:
+    def __init__(
+        self,
+        owner: str,
+        url: str = "https://github.com/{owner}/{name}.git",
+        path: str | None = None,
+        blob_limit: str = "1m",
+        jobs: int = 8,
+    ) -> None:
+        """Read the files of the remote repositories from local bare mirrors,
+        refreshed with shallow and filtered git fetches instead of API calls
+
+        :param owner: Git owner
+        :param url: Remote url, "{owner}" and "{name}" are replaced
+        :param path: Directory holding the mirrors, defaults to the cache directory
+        :param blob_limit: Blobs bigger than this are not fetched
+        :param jobs: Number of concurrent fetches
+        """
+        self.owner = owner
+        self.url = url
+        self.path = path or os.path.join(CACHE_DIR, "mirrors", owner)
+        self.blob_limit = blob_limit
+        self.jobs = jobs
+
+    def _mirror(self, name: str) -> str:
+        return os.path.join(self.path, f"{name.lower()}.git")
+
+    def _env(self) -> dict[str, str]:
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        token = os.environ.get("GITHUB_TOKEN")
+
+        # passed through the environment to keep the token out of the process list
+        if token and self.url.startswith("https://github.com/"):
+            credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+            env.update(
+                GIT_CONFIG_COUNT="1",
+                GIT_CONFIG_KEY_0="http.https://github.com/.extraheader",
+                GIT_CONFIG_VALUE_0=f"Authorization: basic {credentials}",
+            )
+
+        return env
+
+    def _git(self, name: str, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["git", "-C", self._mirror(name), *args],
+            check=False,
+            capture_output=True,
+            env=self._env(),
+        )
+
+    def _fetch(self, name: str, branch: str) -> None:
+        mirror = self._mirror(name)
+        url = self.url.format(owner=self.owner, name=name)
+
+        # reinitializing is a no-op, and repairs a mirror left half created
+        subprocess.run(["git", "init", "--quiet", "--bare", mirror], check=True)
+
+        # a named remote lets git lazily fetch the blobs left out by the filter,
+        # its url is set on every fetch so that a changed url is followed
+        if self._git(name, "remote", "set-url", "origin", url).returncode != 0:
+            r = self._git(name, "remote", "add", "origin", url)
+            if r.returncode != 0:
+                raise RuntimeError(f"git remote add {url} failed: {r.stderr.decode()}")
+
+        r = self._git(
+            name,
+            "fetch",
+            "--quiet",
+            "--no-tags",
+            "--depth=1",
+            f"--filter=blob:limit={self.blob_limit}",
+            "origin",
+            f"+refs/heads/{branch}:refs/heads/{branch}",
+        )
+        if r.returncode == 0:
+            return
+        if not any(error in r.stderr for error in _MISSING_REMOTE):
+            raise RuntimeError(f"git fetch {url} failed: {r.stderr.decode()}")
+
+        # don't read a branch fetched before it was deleted or the url changed
+        self._git(name, "update-ref", "-d", f"refs/heads/{branch}")
+
+    def refresh(self, names: Iterable[str], branch: str) -> None:
+        """Fetch the branch of every repository in parallel"""
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            list(executor.map(lambda name: self._fetch(name, branch), names))
+
+    def blob_sha(self, name: str, branch: str, path: str) -> str | None:
+        r = self._git(
+            name, "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}:{path}"
+        )
+        if r.returncode != 0:
+            return None
+
+        return r.stdout.decode().strip()
+
+    def read_file(self, name: str, branch: str, path: str) -> str | None:
+        r = self._git(name, "cat-file", "blob", f"refs/heads/{branch}:{path}")
+        if r.returncode != 0:
+            return None
+
+        return r.stdout.decode()
@@ -0,0 +1,65 @@
+import os
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import yaml
+
+from git_automation.cache import cache_path, digest
+from git_automation.validation import YAML_LOADER
+
+
+def _load(path: str) -> dict[str, Any]:
+    """Parse a repository file, the cached result is reused while its mtime or
+    its content hash is unchanged
+    """
+    # pickled, YAML scalars such as dates have no JSON representation
+    cached = cache_path("repositories", f"{digest(os.path.abspath(path))}.pickle")
+    stat = os.stat(path)
+
+    try:
+        with open(cached, "rb") as file:
+            entry = pickle.load(file)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        entry = {}
+
+    if (entry.get("mtime_ns"), entry.get("size")) == (stat.st_mtime_ns, stat.st_size):
+        return entry["config"]
+
+    with open(path, "rb") as file:
+        content = file.read()
+    content_digest = digest(content)
+
+    if entry.get("digest") != content_digest:
+        repository_config = yaml.load(content, Loader=YAML_LOADER)
+        if not isinstance(repository_config, dict):
+            raise ValueError(f"{path} must contain a single repository mapping")
+
+        # the filename is the default repository name
+        repository_config.setdefault(
+            "name", os.path.splitext(os.path.basename(path))[0]
+        )
+        entry = {"digest": content_digest, "config": repository_config}
+
+    entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(cached), delete=False) as file:
+        pickle.dump(entry, file)
+    os.replace(file.name, cached)
+
+    return entry["config"]
+
+
+def load_repositories(directory: str) -> list[dict[str, Any]]:
+    """Load the repositories defined one per YAML file in a directory
+
+    :param directory: Directory containing the repository files
+    """
+    paths = sorted(
+        os.path.join(directory, filename)
+        for filename in os.listdir(directory)
+        if filename.endswith((".yml", ".yaml"))
+    )
+
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(_load, paths))
@@ -0,0 +1,226 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pulumi
+import pulumi.dynamic
+
+from git_automation.remote import GithubApi, provider_api
+
+# settings left unmanaged are None
+_SECTIONS = ("actions", "workflow", "dependabot_security_updates", "pages")
+
+
+def _read_actions(api: GithubApi, repository: str) -> dict[str, Any]:
+    r = api.request("GET", f"repos/{api.owner}/{repository}/actions/permissions")
+    r.raise_for_status()
+    permissions = r.json()
+
+    return {
+        "allowed_actions": permissions.get("allowed_actions"),
+        "sha_pinning_required": permissions.get("sha_pinning_required", False),
+    }
+
+
+def _write_actions(api: GithubApi, repository: str, value: dict[str, Any]) -> None:
+    api.request(
+        "PUT",
+        f"repos/{api.owner}/{repository}/actions/permissions",
+        json={"enabled": True, **value},
+    ).raise_for_status()
+
+
+def _read_workflow(api: GithubApi, repository: str) -> dict[str, Any]:
+    r = api.request(
+        "GET", f"repos/{api.owner}/{repository}/actions/permissions/workflow"
+    )
+    r.raise_for_status()
+    permissions = r.json()
+
+    return {
+        "default_workflow_permissions": permissions["default_workflow_permissions"],
+        "can_approve_pull_request_reviews": permissions[
+            "can_approve_pull_request_reviews"
+        ],
+    }
+
+
+def _write_workflow(api: GithubApi, repository: str, value: dict[str, Any]) -> None:
+    api.request(
+        "PUT",
+        f"repos/{api.owner}/{repository}/actions/permissions/workflow",
+        json=value,
+    ).raise_for_status()
+
+
+def _read_dependabot_security_updates(api: GithubApi, repository: str) -> bool:
+    r = api.request("GET", f"repos/{api.owner}/{repository}/automated-security-fixes")
+    if r.status_code != 200:
+        return False
+
+    return r.json()["enabled"]
+
+
+def _write_dependabot_security_updates(
+    api: GithubApi, repository: str, value: bool
+) -> None:
+    api.request(
+        "PUT" if value else "DELETE",
+        f"repos/{api.owner}/{repository}/automated-security-fixes",
+    ).raise_for_status()
+
+
+def _read_pages(api: GithubApi, repository: str) -> dict[str, Any] | None:
+    r = api.request("GET", f"repos/{api.owner}/{repository}/pages")
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    pages = r.json()
+
+    return {
+        "source": {
+            "branch": pages["source"]["branch"],
+            "path": pages["source"]["path"],
+        },
+        "cname": pages.get("cname"),
+        "https_enforced": pages.get("https_enforced", False),
+    }
+
+
+def _write_pages(api: GithubApi, repository: str, value: dict[str, Any]) -> None:
+    path = f"repos/{api.owner}/{repository}/pages"
+
+    # the site has to be created before its cname can be set
+    if api.request("GET", path).status_code == 404:
+        api.request("POST", path, json={"source": value["source"]}).raise_for_status()
+    api.request("PUT", path, json=value).raise_for_status()
+
+
+_READERS: dict[str, Callable[[GithubApi, str], Any]] = {
+    "actions": _read_actions,
+    "workflow": _read_workflow,
+    "dependabot_security_updates": _read_dependabot_security_updates,
+    "pages": _read_pages,
+}
+_WRITERS: dict[str, Callable[[GithubApi, str, Any], None]] = {
+    "actions": _write_actions,
+    "workflow": _write_workflow,
+    "dependabot_security_updates": _write_dependabot_security_updates,
+    "pages": _write_pages,
+}
+
+
+class _RepositorySettingsProvider(pulumi.dynamic.ResourceProvider):
+    # the provider is pickled by reference, nothing secret is captured
+    serialize_as_secret_always = False
+
+    def _apply(self, props: dict[str, Any], sections: list[str]) -> None:
+        api = provider_api(props)
+
+        # one round of concurrent calls, paced by the shared rate limiter
+        with ThreadPoolExecutor(max_workers=len(_SECTIONS)) as executor:
+            for future in [
+                executor.submit(
+                    _WRITERS[section], api, props["repository"], props[section]
+                )
+                for section in sections
+            ]:
+                future.result()
+
+    def _managed(self, props: dict[str, Any]) -> list[str]:
+        return [section for section in _SECTIONS if props.get(section) is not None]
+
+    def _read(self, props: dict[str, Any]) -> dict[str, Any]:
+        """Live value of every managed section, read concurrently"""
+        api = provider_api(props)
+        sections = self._managed(props)
+
+        with ThreadPoolExecutor(max_workers=len(_SECTIONS)) as executor:
+            values = executor.map(
+                lambda section: _READERS[section](api, props["repository"]), sections
+            )
+            return dict(zip(sections, values, strict=True))
+
+    def _changed(self, olds: dict[str, Any], news: dict[str, Any]) -> list[str]:
+        return [
+            section
+            for section in self._managed(news)
+            if olds.get(section) != news[section]
+        ]
+
+    def create(self, props: dict[str, Any]) -> pulumi.dynamic.CreateResult:
+        # the settings already set, e.g. by the per setting resources this one
+        # replaces, aren't written again
+        self._apply(props, self._changed(self._read(props), props))
+        return pulumi.dynamic.CreateResult(props["repository"], props)
+
+    def diff(
+        self, _id: str, olds: dict[str, Any], news: dict[str, Any]
+    ) -> pulumi.dynamic.DiffResult:
+        replaces = [key for key in ("owner", "repository") if olds[key] != news[key]]
+
+        # refresh merges the live values into olds, see read
+        return pulumi.dynamic.DiffResult(
+            changes=bool(replaces or self._changed(olds, news)), replaces=replaces
+        )
+
+    def update(
+        self, _id: str, olds: dict[str, Any], news: dict[str, Any]
+    ) -> pulumi.dynamic.UpdateResult:
+        self._apply(news, self._changed(olds, news))
+        return pulumi.dynamic.UpdateResult(news)
+
+    def read(self, id_: str, props: dict[str, Any]) -> pulumi.dynamic.ReadResult:
+        return pulumi.dynamic.ReadResult(id_, {**props, **self._read(props)})
+
+    def delete(self, _id: str, props: dict[str, Any]) -> None:
+        # permissions are left as they are, like with the per setting resources
+        if props.get("pages") is not None:
+            r = provider_api(props).request(
+                "DELETE", f"repos/{props['owner']}/{props['repository']}/pages"
+            )
+            if r.status_code != 404:
+                r.raise_for_status()
+
+
+class RepositorySettings(pulumi.dynamic.Resource, module="github", name="Settings"):
+    def __init__(
+        self,
+        name: str,
+        owner: str,
+        repository: str,
+        actions: dict[str, Any] | None = None,
+        workflow: dict[str, Any] | None = None,
+        dependabot_security_updates: bool | None = None,
+        pages: dict[str, Any] | None = None,
+        rate_limit: dict[str, Any] | None = None,
+        opts: pulumi.ResourceOptions | None = None,
+    ) -> None:
+        """Repository settings read and written together in one round of API
+        calls, a setting left to None isn't managed
+
+        :param name: Resource name
+        :param owner: Git owner
+        :param repository: Repository name
+        :param actions: Actions permissions (allowed_actions, sha_pinning_required)
+        :param workflow: Workflow permissions (default_workflow_permissions,
+            can_approve_pull_request_reviews)
+        :param dependabot_security_updates: Dependabot security updates enabled
+        :param pages: Pages site (source, cname, https_enforced)
+        :param rate_limit: RateLimiter arguments of the API calls, None for the
+            defaults
+        """
+        super().__init__(
+            _RepositorySettingsProvider(),
+            name,
+            {
+                "owner": owner,
+                "repository": repository,
+                "actions": actions,
+                "workflow": workflow,
+                "dependabot_security_updates": dependabot_security_updates,
+                "pages": pages,
+                "rate_limit": rate_limit,
+            },
+            opts,
+        )
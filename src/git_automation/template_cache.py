@@ -0,0 +1,88 @@
+import marshal
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from types import CodeType
+
+import jinja2
+from jinja2 import Environment, Template
+
+from git_automation.cache import digest
+
+
+class TemplateCache:
+    def __init__(
+        self,
+        environment: Environment,
+        maxsize: int = 256,
+        directory: str | None = None,
+    ) -> None:
+        """Compiled templates built from strings, kept in memory with LRU eviction
+        and optionally persisted on disk as bytecode
+
+        :param environment: Environment compiling the templates
+        :param maxsize: Number of templates kept in memory
+        :param directory: Bytecode directory, None to keep the templates in
+            memory only
+        """
+        self.environment = environment
+        self.maxsize = maxsize
+        self.directory = directory
+        self.templates: OrderedDict[str, Template] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _bytecode_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _load(self, key: str) -> CodeType | None:
+        try:
+            with open(self._bytecode_path(key), "rb") as file:
+                return marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _dump(self, key: str, code: CodeType) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as file:
+            marshal.dump(code, file)
+        os.replace(file.name, self._bytecode_path(key))
+
+    def from_string(self, source: str) -> Template:
+        """Same as Environment.from_string, compiled once per distinct source"""
+        # bytecode is only valid for the python and jinja versions producing it
+        key = digest(f"{sys.version_info[:2]}\0{jinja2.__version__}\0{source}")
+
+        if key in self.templates:
+            self.hits += 1
+            self.templates.move_to_end(key)
+            return self.templates[key]
+
+        code = self._load(key) if self.directory else None
+        if code is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            code = self.environment.compile(source)
+            if self.directory:
+                self._dump(key, code)
+
+        template = self.environment.template_class.from_code(
+            self.environment, code, self.environment.make_globals(None)
+        )
+        self.templates[key] = template
+        if len(self.templates) > self.maxsize:
+            self.templates.popitem(last=False)
+
+        return template
+
+    def report(self) -> str:
+        total = self.hits + self.disk_hits + self.misses
+        rate = (self.hits + self.disk_hits) / total if total else 0
+
+        return (
+            f"{total} templates, {self.hits} memory hits, {self.disk_hits} disk hits, "
+            f"{self.misses} compiled ({rate:.0%} hit rate)"
+        )
@@ -0,0 +1,218 @@
+import itertools
+import json
+import os
+import re
+import tomllib
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import yaml
+
+from git_automation.cache import cache_path, digest
+
+# bump to invalidate the cached results when the checks change
+_VALIDATION_VERSION = "2"
+
+# strings are matched first so that "//" inside urls is kept, comments are
+# removed before the other rewrites so that a comment can't hide a trailing comma
+_JSON5_COMMENTS = re.compile(
+    r'("(?:\\.|[^"\\])*")|\'((?:\\.|[^\'\\])*)\'|//[^\n]*|/\*.*?\*/', re.DOTALL
+)
+# unquoted keys, hexadecimal numbers, explicit plus signs and leading or trailing
+# decimal points are rewritten outside of the strings
+_JSON5_TOKENS = re.compile(
+    r'("(?:\\.|[^"\\])*")'
+    r"|,(\s*[}\]])"
+    r"|([A-Za-z_$][\w$]*)(?=\s*:)"
+    r"|(?<![\w.])([+-]?)0[xX]([0-9a-fA-F]+)"
+    r"|(?<![\w.])(\+)(?=[\d.I])"
+    r"|(?<![\w.])(\.)(?=\d)"
+    r"|(?<=\d)(\.)(?!\d)"
+)
+# libyaml bindings are missing from some PyYAML builds
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_MATRIX_EXPRESSION = re.compile(r"\$\{\{\s*matrix\.([\w-]+)\s*\}\}")
+
+
+class ValidationError(Exception):
+    pass
+
+
+def _json5_comment(match: re.Match) -> str:
+    if match[1]:
+        return match[1]
+    if match[2] is not None:
+        # single quoted string, only the quote escaping differs from json
+        return '"' + match[2].replace("\\'", "'").replace('"', '\\"') + '"'
+
+    return " "
+
+
+def _json5_token(match: re.Match) -> str:
+    if match[1]:
+        return match[1]
+    if match[2] is not None:
+        return match[2]
+    if match[3]:
+        return f'"{match[3]}"'
+    if match[5]:
+        return f"{match[4]}{int(match[5], 16)}"
+    if match[6]:
+        return ""
+    if match[7]:
+        return "0."
+
+    return ".0"
+
+
+def _load_json5(content: str) -> Any:
+    content = _JSON5_COMMENTS.sub(_json5_comment, content)
+    return json.loads(_JSON5_TOKENS.sub(_json5_token, content))
+
+
+def _parse(file: str, content: str) -> Any:
+    extension = os.path.splitext(file)[1]
+
+    if extension in (".yml", ".yaml"):
+        return yaml.load(content, Loader=YAML_LOADER)
+    if extension == ".json5":
+        return _load_json5(content)
+    if extension == ".toml":
+        return tomllib.loads(content)
+
+    return None
+
+
+def _matrix_combinations(matrix: dict[str, Any]) -> list[dict[str, Any]]:
+    keys = {k: v for k, v in matrix.items() if k not in ("include", "exclude")}
+    combinations = (
+        [dict(zip(keys, values)) for values in itertools.product(*keys.values())]
+        if keys
+        else []
+    )
+
+    for exclude in matrix.get("exclude", []):
+        combinations = [c for c in combinations if not exclude.items() <= c.items()]
+
+    for include in matrix.get("include", []):
+        matches = [
+            c
+            for c in combinations
+            if all(c[k] == v for k, v in include.items() if k in keys)
+        ]
+        if keys and matches:
+            for combination in matches:
+                combination.update(include)
+        else:
+            combinations.append(dict(include))
+
+    return combinations
+
+
+def _check_names(workflow: dict[str, Any]) -> list[str]:
+    """Name of the check runs created by a workflow, matrix jobs expanded like GitHub does"""
+    check_names = []
+
+    for job_id, job in (workflow.get("jobs") or {}).items():
+        name = job.get("name", job_id)
+        matrix = (job.get("strategy") or {}).get("matrix")
+
+        if not matrix:
+            check_names.append(name)
+            continue
+
+        for combination in _matrix_combinations(matrix):
+            expanded = _MATRIX_EXPRESSION.sub(
+                lambda match, combination=combination: str(
+                    combination.get(match[1], "")
+                ),
+                name,
+            )
+            if expanded == name:
+                values = ", ".join(str(v) for v in combination.values())
+                expanded = f"{name} ({values})"
+            check_names.append(expanded)
+
+    return check_names
+
+
+def _validate(file: str, content: str) -> dict[str, Any]:
+    try:
+        document = _parse(file, content)
+    except (yaml.YAMLError, ValueError) as e:
+        raise ValidationError(f"{file} is not valid: {e}") from e
+
+    if file.startswith(".github/workflows/"):
+        if not isinstance(document, dict) or not document.get("jobs"):
+            raise ValidationError(f"{file} doesn't define any job")
+        return {"checks": _check_names(document)}
+
+    return {"checks": []}
+
+
+def _validate_cached(file: str, content: str) -> dict[str, Any]:
+    # the file extension and location decide how the content is checked
+    key = digest(f"{_VALIDATION_VERSION}\0{file}\0{content}")
+    path = cache_path("validation", f"{key}.json")
+
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    result = _validate(file, content)
+
+    with open(path, "w") as f:
+        json.dump(result, f)
+
+    return result
+
+
+def validate_repositories(repositories: Iterable[Any]) -> None:
+    """Parse every structured file rendered for the repositories and check that
+    workflow jobs provide the status checks required by the repository ruleset
+
+    Identical renders across repositories are validated once, results are cached
+    on disk by content hash so unchanged outputs are never parsed again.
+    """
+    repositories = list(repositories)
+    files = {
+        (file, content)
+        for repository in repositories
+        for _, file, content in repository.files
+        if os.path.splitext(file)[1] in (".yml", ".yaml", ".json5", ".toml")
+    }
+
+    errors = []
+    results = {}
+    with ThreadPoolExecutor() as executor:
+        futures = {
+            key: executor.submit(_validate_cached, *key) for key in sorted(files)
+        }
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except ValidationError as e:
+                errors.append(f"{e}")
+
+    for repository in repositories:
+        workflows = [
+            (file, content)
+            for _, file, content in repository.files
+            if (file, content) in results and file.startswith(".github/workflows/")
+        ]
+        if not workflows:
+            continue
+
+        check_names = {check for key in workflows for check in results[key]["checks"]}
+        for check in repository.workflow_checks():
+            if check not in check_names:
+                errors.append(
+                    f"{repository.name}: required check {check!r} isn't provided by any workflow"
+                )
+
+    if errors:
+        raise ValidationError("\n".join(errors))
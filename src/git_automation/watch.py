@@ -0,0 +1,254 @@
+"""Re-render the managed files of every repository when a template changes
+
+    python -m git_automation.watch --stack prod
+
+Every file pushed by the stack is rendered once and the templates it loads
+(includes are resolved while rendering) or the static file it is read from are
+recorded. The package templates and static files are then polled, a change only
+re-renders the files depending on it and prints their diff. Adding or removing a
+file, or editing manifest.yml, renders everything again.
+
+GitHub is never reached: the existing READMEs are read from the local git mirrors
+when `mirror` is configured, otherwise the default README template is used.
+"""
+
+import argparse
+import difflib
+import os
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from jinja2 import Environment, StrictUndefined, Template, TemplateError
+
+from git_automation.git_repository_component import env, readme_template
+from git_automation.harness import load_stack_config
+from git_automation.manifest import (
+    compile_conditions,
+    expand_manifest,
+    load_manifest,
+    read_source,
+    readme_context,
+    repository_context,
+)
+from git_automation.remote import GitMirror
+from git_automation.repositories import load_repositories
+from git_automation.template_cache import TemplateCache
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# its change can add or remove managed files
+_MANIFEST = "manifest.yml"
+
+
+class _TrackingEnvironment(Environment):
+    def __init__(self) -> None:
+        """Same environment as the Pulumi program, recording every template
+        loaded as a package relative path, reloaded when modified
+        """
+        super().__init__(
+            loader=env.loader,
+            keep_trailing_newline=env.keep_trailing_newline,
+            extensions=list(env.extensions),
+            auto_reload=True,
+        )
+        self.loaded: set[str] = set()
+
+    def get_template(
+        self,
+        name: str | Template,
+        parent: str | None = None,
+        globals: dict[str, Any] | None = None,
+    ) -> Template:
+        if isinstance(name, str):
+            self.loaded.add(f"templates/{name}")
+        return super().get_template(name, parent, globals)
+
+
+def _load_stack(stack: str) -> tuple[str, list[tuple[dict, dict]], dict | None]:
+    """Owner, (repository config, context) couples and mirror config of a stack"""
+    project, config = load_stack_config(stack)
+
+    def get(key: str, default: Any = None) -> Any:
+        return config.get(f"{project}:{key}", default)
+
+    owner = config["github:owner"]
+    settings = {
+        "owner": owner,
+        "default_branch_name": get("default_branch_name", "main"),
+        "branch_name": get("branch_name"),
+        "funding": get("funding"),
+        "contact_email": get("contact_email"),
+        "security_email": get("security_email"),
+    }
+
+    repository_configs = list(get("repositories", []))
+    if get("repositories_dir"):
+        repository_configs += load_repositories(get("repositories_dir"))
+
+    return (
+        owner,
+        [
+            (repository_config, repository_context(repository_config, settings))
+            for repository_config in repository_configs
+        ],
+        get("mirror"),
+    )
+
+
+def _renderers(
+    stack: str, environment: _TrackingEnvironment
+) -> dict[tuple[str, str], Callable[[], tuple[str, set[str]]]]:
+    """Function rendering each (repository, file) couple with its dependencies"""
+    owner, repositories, mirror = _load_stack(stack)
+    remote = GitMirror(owner, **mirror) if mirror is not None else None
+    cache = TemplateCache(environment)
+    # shares the loaded templates set, like plan_env
+    strict = environment.overlay(undefined=StrictUndefined, cache_size=400)
+    manifest = load_manifest()
+    conditions = compile_conditions(manifest)
+    renderers = {}
+
+    def template(path: str, values: dict[str, Any]):
+        return lambda: (strict.get_template(path).render(values), set())
+
+    def source(path: str):
+        return lambda: (read_source(path), {path})
+
+    def readme(name: str, branch: str, values: dict[str, Any]):
+        def render() -> tuple[str, set[str]]:
+            contents = remote.read_file(name, branch, "README.md") if remote else None
+            return readme_template(contents, cache).render(values), set()
+
+        return render
+
+    for repository_config, context in repositories:
+        name = repository_config["name"]
+
+        for entry, _, file, path in expand_manifest(manifest, conditions, context):
+            if "source" in entry:
+                renderers[name, file] = source(path)
+            else:
+                values = {k: context[k] for k in entry.get("context", [])}
+                renderers[name, file] = template(path, values)
+
+        if repository_config.get("readme", False):
+            renderers[name, "README.md"] = readme(
+                name,
+                context["default_branch_name"],
+                {
+                    "repository_name": f"{owner}/{name}",
+                    **readme_context(repository_config, context),
+                },
+            )
+
+    return renderers
+
+
+def _render(
+    environment: _TrackingEnvironment, render: Callable[[], tuple[str, set[str]]]
+) -> tuple[str, set[str]]:
+    environment.loaded.clear()
+    content, dependencies = render()
+
+    return content, dependencies | environment.loaded
+
+
+def _scan() -> dict[str, int]:
+    """Modification time of every template and static file of the package"""
+    mtimes = {}
+    for root, dirs, files in os.walk(PACKAGE_DIR):
+        dirs[:] = [directory for directory in dirs if directory != "__pycache__"]
+        for filename in files:
+            if filename.endswith(".py"):
+                continue
+            path = os.path.join(root, filename)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            mtimes[os.path.relpath(path, PACKAGE_DIR).replace(os.sep, "/")] = mtime
+
+    return mtimes
+
+
+def _print_diff(key: tuple[str, str], before: str, after: str) -> None:
+    label = "/".join(key)
+    sys.stdout.writelines(
+        difflib.unified_diff(
+            before.splitlines(keepends=True),
+            after.splitlines(keepends=True),
+            fromfile=f"a/{label}",
+            tofile=f"b/{label}",
+        )
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stack", default="prod")
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    environment = _TrackingEnvironment()
+
+    def build() -> dict[tuple[str, str], tuple[str, set[str], Callable]]:
+        renderers = _renderers(args.stack, environment)
+        return {
+            key: (*_render(environment, render), render)
+            for key, render in renderers.items()
+        }
+
+    outputs = build()
+    mtimes = _scan()
+    print(f"watching {len(outputs)} files, press Ctrl+C to stop", file=sys.stderr)
+
+    while True:
+        time.sleep(args.interval)
+        current = _scan()
+        if current == mtimes:
+            continue
+
+        start = time.perf_counter()
+        changed = {path for path in current if mtimes.get(path) != current[path]}
+        structural = current.keys() != mtimes.keys() or _MANIFEST in changed
+        mtimes = current
+
+        try:
+            if structural:
+                updated = build()
+            else:
+                updated = dict(outputs)
+                for key, (_, dependencies, render) in outputs.items():
+                    if dependencies & changed:
+                        updated[key] = (*_render(environment, render), render)
+        except (TemplateError, OSError, ValueError) as error:
+            # keep the last good outputs until the file is fixed
+            location = getattr(error, "name", None)
+            if location is not None:
+                location = f"templates/{location}:{error.lineno}: "
+            print(f"error: {location or ''}{error}", file=sys.stderr)
+            continue
+
+        rendered = 0
+        for key in sorted(outputs.keys() | updated.keys()):
+            before = outputs[key][0] if key in outputs else ""
+            after = updated[key][0] if key in updated else ""
+            if before != after:
+                rendered += 1
+                _print_diff(key, before, after)
+
+        outputs = updated
+        print(
+            f"{', '.join(sorted(changed)) or 'files added or removed'}: "
+            f"{rendered} files changed in {(time.perf_counter() - start) * 1000:.0f} ms",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        pass